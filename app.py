@@ -11,37 +11,64 @@ if script_dir not in sys.path:
     sys.path.insert(0, script_dir)
 
 import json
+import threading
 from pathlib import Path
 
+# Faster settings parsing when orjson is available
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 from core import logger
-from core.theme import get_color, get_font, is_dark
+from core.theme import get_font, get_palette, is_dark
 from core.vision_registry import VisionRegistry
 from core import system_monitor
 from core.image_manager import ImageManager
 import tkinter as tk
 from tkinter import ttk
 
-CONFIG_FILE = Path(__file__).parent / "config" / "settings.json"
+CONFIG_FILE = (Path(__file__).parent / "config" / "settings.json").resolve()
+SYSTEM_INFO_CACHE = logger.LOG_DIR / "system_info.json"
 
 os.environ["CUDA_DEVICE_ORDER"] = "PCI_BUS_ID"
 
 
+def _tcl_word(value) -> str:
+    """Quote a color string or font tuple as a single Tcl word."""
+    if isinstance(value, (tuple, list)):
+        return "{" + " ".join(f"{{{v}}}" for v in value) + "}"
+    return f"{{{value}}}"
+
+
+# Dark title bar DWM calls, resolved once (Windows only)
+if sys.platform == 'win32':
+    _GetParent = ctypes.windll.user32.GetParent
+    _GetParent.argtypes = [ctypes.c_void_p]
+    _GetParent.restype = ctypes.c_void_p
+    _DwmSetWindowAttribute = ctypes.windll.dwmapi.DwmSetWindowAttribute
+    _DwmSetWindowAttribute.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_void_p, ctypes.c_uint]
+    _DwmSetWindowAttribute.restype = ctypes.c_long
+
+    # Attribute value is always 1 (enable dark mode)
+    _DARK_VALUE = ctypes.c_int(1)
+    _DARK_SIZE = ctypes.sizeof(_DARK_VALUE)
+    _DARK_PTR = ctypes.byref(_DARK_VALUE)
+else:
+    _GetParent = _DwmSetWindowAttribute = None
+
+
 def set_dark_title_bar(window):
     """Set dark title bar on Windows 10/11."""
-    if sys.platform != 'win32':
+    if _DwmSetWindowAttribute is None:
         return
 
     try:
-        window.update_idletasks()
-        hwnd = ctypes.windll.user32.GetParent(window.winfo_id())
-        value = ctypes.c_int(1)
-        result = ctypes.windll.dwmapi.DwmSetWindowAttribute(
-            hwnd, 20, ctypes.byref(value), ctypes.sizeof(value)
-        )
+        hwnd = _GetParent(window.winfo_id())
+        result = _DwmSetWindowAttribute(hwnd, 20, _DARK_PTR, _DARK_SIZE)
         if result != 0:
-            ctypes.windll.dwmapi.DwmSetWindowAttribute(
-                hwnd, 19, ctypes.byref(value), ctypes.sizeof(value)
-            )
+            _DwmSetWindowAttribute(hwnd, 19, _DARK_PTR, _DARK_SIZE)
     except Exception as e:
         logger.debug(f"Could not set dark title bar: {e}")
 
@@ -56,8 +83,7 @@ class ImageBuddyApp:
 
         # Set size and position BEFORE showing
         width, height = 1200, 800
-        screen_w = self.root.winfo_screenwidth()
-        screen_h = self.root.winfo_screenheight()
+        screen_w, screen_h = self.root.wm_maxsize()  # One Tcl call for both dimensions
         x = (screen_w - width) // 2
         y = (screen_h - height) // 2
         self.root.geometry(f"{width}x{height}+{x}+{y}")
@@ -76,17 +102,24 @@ class ImageBuddyApp:
             try:
                 from PIL import Image, ImageTk
                 img = Image.open(icon_png)
+                img.thumbnail((64, 64), Image.Resampling.LANCZOS)
+                img.load()
                 photo = ImageTk.PhotoImage(img)
                 self.root.iconphoto(True, photo)
                 self._icon_photo = photo
             except Exception as e:
                 logger.debug(f"Could not set .png icon: {e}")
 
+        # Settings (read once, shared by the startup helpers below)
+        self._load_settings()
+
         # Vision registry (for Florence-2 instances)
-        self.vision_registry = VisionRegistry()
+        self.vision_registry = VisionRegistry(
+            cache_size=self._settings.get("vision_cache_size", 512)
+        )
 
-        # Image manager singleton
-        self.image_manager = ImageManager()
+        # Image manager singleton (created on first use - opens the database)
+        self._image_manager = None
 
         # API Server (initialized but not started yet)
         self.api_server = None
@@ -110,69 +143,126 @@ class ImageBuddyApp:
 
         logger.info("ImageBuddy started")
 
-        # Log system info for debugging
-        self._log_system_info()
+        # Log system info for debugging (off the UI thread - torch import is slow)
+        threading.Thread(target=self._log_system_info, daemon=True, name="sysinfo").start()
 
         # Auto-start API server if configured
         self._auto_start_api()
 
+    @property
+    def image_manager(self) -> ImageManager:
+        """Image manager singleton, constructed on first access."""
+        if self._image_manager is None:
+            self._image_manager = ImageManager()
+        return self._image_manager
+
     def _log_system_info(self):
-        """Log system information for debugging support."""
+        """Log system information for debugging support.
+
+        The report is cached per host, Python, torch build, CUDA driver and GPU
+        set so warm starts skip the torch import. The key is read from package
+        metadata and NVML, both cheap next to importing torch.
+        """
         import platform
+        from importlib import metadata
+
+        try:
+            # Local version carries the CUDA build, e.g. 2.3.1+cu121
+            torch_version = metadata.version("torch")
+        except metadata.PackageNotFoundError:
+            torch_version = None
+
+        key = [
+            platform.node(),
+            sys.version,
+            torch_version,
+            system_monitor.get_cuda_driver_version(),
+            [gpu["name"] for gpu in system_monitor.get_all_gpu_static_info()],
+        ]
+        lines = None
+        try:
+            cached = _json_loads(SYSTEM_INFO_CACHE.read_bytes())
+            if cached.get("key") == key:
+                lines = cached.get("lines")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"[App] Ignoring unreadable system info cache: {e}")
+
+        if lines is None:
+            lines = self._collect_system_info()
+            try:
+                SYSTEM_INFO_CACHE.write_text(json.dumps({"key": key, "lines": lines}, indent=2), encoding="utf-8")
+            except Exception as e:
+                logger.debug(f"[App] Could not write system info cache: {e}")
 
-        logger.info("=" * 50)
-        logger.info("SYSTEM INFORMATION")
-        logger.info("=" * 50)
-        logger.info(f"App Version: 1.0.0")
-        logger.info(f"Python: {sys.version}")
-        logger.info(f"Platform: {platform.system()} {platform.release()}")
-        logger.info(f"Machine: {platform.machine()}")
+        for line in lines:
+            logger.info(line)
+
+    def _collect_system_info(self) -> list:
+        """Probe platform, GPU and PyTorch details and return the report lines."""
+        import platform
+
+        lines = [
+            "=" * 50,
+            "SYSTEM INFORMATION",
+            "=" * 50,
+            "App Version: 1.0.0",
+            f"Python: {sys.version}",
+            f"Platform: {platform.system()} {platform.release()}",
+            f"Machine: {platform.machine()}",
+        ]
 
         # GPU info
         try:
-            gpu_count = system_monitor.get_gpu_count()
-            if gpu_count > 0:
-                logger.info(f"GPUs Detected: {gpu_count}")
-                for i in range(gpu_count):
-                    info = system_monitor.get_gpu_info(i)
-                    if info:
-                        logger.info(f"  GPU {i}: {info.get('name', 'Unknown')} - {info.get('memory_total', 0):.0f} MB VRAM")
+            gpus = system_monitor.get_all_gpu_static_info()
+            if gpus:
+                lines.append(f"GPUs Detected: {len(gpus)}")
+                for info in gpus:
+                    lines.append(f"  GPU {info['index']}: {info['name']} - {info['memory_total']:.0f} MB VRAM")
             else:
-                logger.info("GPUs Detected: None (CPU mode)")
+                lines.append("GPUs Detected: None (CPU mode)")
         except Exception as e:
-            logger.info(f"GPU Detection: Failed ({e})")
+            lines.append(f"GPU Detection: Failed ({e})")
 
         # PyTorch info
         try:
             import torch
-            logger.info(f"PyTorch: {torch.__version__}")
-            logger.info(f"CUDA Available: {torch.cuda.is_available()}")
+            lines.append(f"PyTorch: {torch.__version__}")
+            lines.append(f"CUDA Available: {torch.cuda.is_available()}")
             if torch.cuda.is_available():
-                logger.info(f"CUDA Version: {torch.version.cuda}")
+                lines.append(f"CUDA Version: {torch.version.cuda}")
         except ImportError:
-            logger.info("PyTorch: Not installed")
+            lines.append("PyTorch: Not installed")
 
-        logger.info("=" * 50)
+        lines.append("=" * 50)
+        return lines
+
+    def _load_settings(self):
+        """Load settings.json once and cache it on the app."""
+        self._settings = {}
+        try:
+            self._settings = _json_loads(CONFIG_FILE.read_bytes())
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"[App] Failed to load settings: {e}")
 
     def _init_api_server(self):
         """Initialize the API server."""
         try:
             from core.api_server import APIServer
 
-            # Load settings
-            settings = {}
-            if CONFIG_FILE.exists():
-                with open(CONFIG_FILE, "r") as f:
-                    settings = json.load(f)
-
-            host = settings.get("api_host", "127.0.0.1")
-            port = settings.get("api_port", 5000)
+            host = self._settings.get("api_host", "127.0.0.1")
+            port = self._settings.get("api_port", 5000)
 
             self.api_server = APIServer(
-                self.image_manager,
+                None,  # Resolved lazily to the ImageManager singleton
                 self.vision_registry,
                 host=host,
-                port=port
+                port=port,
+                batch_size=self._settings.get("api_batch_size", 8),
+                batch_wait_ms=self._settings.get("api_batch_wait_ms", 20)
             )
             logger.info("[App] API Server initialized")
         except Exception as e:
@@ -182,46 +272,40 @@ class ImageBuddyApp:
     def _auto_start_api(self):
         """Auto-start API server if configured."""
         try:
-            if CONFIG_FILE.exists():
-                with open(CONFIG_FILE, "r") as f:
-                    settings = json.load(f)
-
-                if settings.get("api_auto_start", False) and self.api_server:
-                    logger.info("[App] Auto-starting API server...")
-                    self.api_server.start()
+            if self._settings.get("api_auto_start", False) and self.api_server:
+                logger.info("[App] Auto-starting API server...")
+                self.api_server.start()
         except Exception as e:
             logger.error(f"[App] Auto-start API error: {e}")
 
     def _setup_styles(self):
         """Setup ttk styles for the application."""
-        style = ttk.Style()
-        style.theme_use('classic')
-        style.configure("TButton", takefocus=False)
-
-        # Block canvas auto-scroll on focus
-        def block_all_focus_scroll(event):
-            w = event.widget
-            while w:
-                if isinstance(w, tk.Canvas):
-                    return "break"
-                w = w.master
-            return None
-
-        self.root.bind("<FocusIn>", block_all_focus_scroll)
-
-        # Theme colors
-        bg_main = get_color("bg_main")
-        bg_card = get_color("bg_card")
-        bg_sidebar = get_color("bg_sidebar")
-        bg_input = get_color("bg_input")
-        accent = get_color("accent")
-        accent_dark = get_color("accent_dark")
-        danger = get_color("danger")
-        danger_dark = get_color("danger_dark")
-        text_primary = get_color("text_primary")
-        text_secondary = get_color("text_secondary")
-        text_hint = get_color("text_hint")
-        text_disabled = get_color("text_disabled")
+        self.root.tk.call("ttk::style", "theme", "use", "classic")
+
+        # Block canvas auto-scroll on focus (tagged widgets only)
+        from ui.ui_utils import CANVAS_CHILD_TAG
+        self.root.tk.eval("proc ::ib_focus_block {} { return -code break }")
+        self.root.tk.call("bind", CANVAS_CHILD_TAG, "<FocusIn>", "::ib_focus_block")
+
+        # Theme colors (one palette fetch instead of a lookup per color)
+        palette = get_palette()
+        bg_main = palette["bg_main"]
+        bg_card = palette["bg_card"]
+        bg_sidebar = palette["bg_sidebar"]
+        bg_input = palette["bg_input"]
+        bg_hover = palette["bg_hover"]
+        accent = palette["accent"]
+        accent_dark = palette["accent_dark"]
+        danger = palette["danger"]
+        danger_dark = palette["danger_dark"]
+        text_primary = palette["text_primary"]
+        text_secondary = palette["text_secondary"]
+        text_hint = palette["text_hint"]
+        text_disabled = palette["text_disabled"]
+        scrollbar_fg = palette["scrollbar_fg"]
+        scrollbar_bg = palette["scrollbar_bg"]
+        border_dark = palette["border_dark"]
+        separator = palette["separator"]
 
         self.root.configure(bg=bg_main)
 
@@ -231,171 +315,146 @@ class ImageBuddyApp:
         font_body = get_font("body")
         font_small = get_font("small")
 
-        self.root.option_add("*Font", font_body)
-
-        # Frames
-        style.configure("Main.TFrame", background=bg_main)
-        style.configure("Sidebar.TFrame", background=bg_sidebar)
-        style.configure("Card.TFrame", background=bg_card, relief="flat", borderwidth=0)
-        style.configure("Hover.Card.TFrame", background=get_color("bg_hover"))
-
-        # Labels
-        style.configure("TLabel", background=bg_main, foreground=text_primary)
-        style.configure("Heading.TLabel", font=font_heading, foreground=text_primary, background=bg_main)
-        style.configure("Subheading.TLabel", font=font_subheading, foreground=text_primary, background=bg_main)
-        style.configure("Hint.TLabel", font=font_small, foreground=text_hint, background=bg_main)
-
-        # Buttons
-        style.configure("TButton",
-                        font=font_body,
-                        padding=6,
-                        background=bg_sidebar,
-                        foreground=text_primary)
-        style.map("TButton",
-                  background=[("active", get_color("bg_hover")), ("pressed", get_color("bg_hover"))],
-                  foreground=[("disabled", text_disabled)])
-
-        style.configure("Primary.TButton",
-                        foreground="white", background=accent, font=font_subheading)
-        style.map("Primary.TButton",
-                  background=[("active", accent_dark), ("pressed", accent_dark)],
-                  foreground=[("disabled", text_disabled)])
-
-        style.configure("Danger.TButton",
-                        foreground="white", background=danger, font=font_subheading)
-        style.map("Danger.TButton",
-                  background=[("active", danger_dark), ("pressed", danger_dark)],
-                  foreground=[("disabled", text_disabled)])
-
-        style.configure("Small.TButton",
-                        font=font_body,
-                        padding=[6, 3],
-                        background=bg_sidebar,
-                        foreground=text_primary)
-        style.map("Small.TButton",
-                  background=[("active", get_color("bg_hover")), ("pressed", get_color("bg_hover"))],
-                  foreground=[("disabled", text_disabled)])
-
-        style.configure("Small.Primary.TButton",
-                        font=font_body,
-                        padding=[6, 3],
-                        foreground="white",
-                        background=accent)
-        style.map("Small.Primary.TButton",
-                  background=[("active", accent_dark), ("pressed", accent_dark)],
-                  foreground=[("disabled", text_disabled)])
-
-        style.configure("Small.Danger.TButton",
-                        font=font_body,
-                        padding=[6, 3],
-                        foreground="white",
-                        background=danger)
-        style.map("Small.Danger.TButton",
-                  background=[("active", danger_dark), ("pressed", danger_dark)],
-                  foreground=[("disabled", text_disabled)])
-
-        # Notebook tabs
-        style.configure("TNotebook", background=bg_main, borderwidth=0)
-        style.configure("TNotebook.Tab",
-                        padding=[20, 10],
-                        font=font_subheading,
-                        background=bg_sidebar,
-                        foreground=text_secondary)
-        style.map("TNotebook.Tab",
-                  background=[("selected", bg_card), ("active", get_color("bg_hover"))],
-                  foreground=[("selected", accent), ("!selected", text_primary)])
-
-        # Entry / Input fields
-        style.configure("TEntry",
-                        fieldbackground=bg_input,
-                        foreground=text_primary,
-                        insertcolor=text_primary)
-
-        # Spinbox
-        style.configure("TSpinbox",
-                        fieldbackground=bg_input,
-                        foreground=text_primary,
-                        insertcolor=text_primary,
-                        arrowcolor=text_primary,
-                        background=bg_sidebar)
-
-        # Combobox
-        style.configure("TCombobox",
-                        font=font_body,
-                        padding=4,
-                        fieldbackground=bg_input,
-                        foreground=text_primary,
-                        background=bg_input,
-                        arrowcolor=text_primary)
-        style.map("TCombobox",
-                  fieldbackground=[("readonly", bg_input), ("disabled", bg_sidebar)],
-                  foreground=[("readonly", text_primary), ("disabled", text_disabled)],
-                  background=[("readonly", bg_input)])
-
-        self.root.option_add("*TCombobox*Listbox.background", bg_input)
-        self.root.option_add("*TCombobox*Listbox.foreground", text_primary)
-        self.root.option_add("*TCombobox*Listbox.selectBackground", accent)
-        self.root.option_add("*TCombobox*Listbox.selectForeground", "white")
-
-        # Tk widgets
-        self.root.option_add("*Text.background", bg_input)
-        self.root.option_add("*Text.foreground", text_primary)
-        self.root.option_add("*Text.insertBackground", text_primary)
-        self.root.option_add("*Text.selectBackground", accent)
-        self.root.option_add("*Text.selectForeground", "white")
-
-        self.root.option_add("*Entry.background", bg_input)
-        self.root.option_add("*Entry.foreground", text_primary)
-        self.root.option_add("*Entry.insertBackground", text_primary)
-        self.root.option_add("*Entry.selectBackground", accent)
-        self.root.option_add("*Entry.selectForeground", "white")
-
-        self.root.option_add("*Spinbox.background", bg_input)
-        self.root.option_add("*Spinbox.foreground", text_primary)
-        self.root.option_add("*Spinbox.insertBackground", text_primary)
-        self.root.option_add("*Spinbox.selectBackground", accent)
-        self.root.option_add("*Spinbox.selectForeground", "white")
-        self.root.option_add("*Spinbox.buttonBackground", bg_sidebar)
-
-        # Scrollbar
-        self.root.option_add("*Scrollbar.background", get_color("scrollbar_fg"))
-        self.root.option_add("*Scrollbar.troughColor", get_color("scrollbar_bg"))
-        self.root.option_add("*Scrollbar.activeBackground", get_color("border_dark"))
-        self.root.option_add("*Scrollbar.highlightBackground", bg_main)
-        self.root.option_add("*Scrollbar.highlightColor", bg_main)
-
-        # Checkbutton
-        style.configure("TCheckbutton",
-                        background=bg_main,
-                        foreground=text_primary)
-        style.map("TCheckbutton",
-                  foreground=[("disabled", text_disabled)],
-                  background=[("disabled", bg_main)])
-
-        # Progressbar
-        style.configure("TProgressbar",
-                        background=accent,
-                        troughcolor=get_color("scrollbar_bg"))
-
-        # Separator
-        style.configure("TSeparator", background=get_color("separator"))
-
-        # ttk Scrollbar
-        style.configure("TScrollbar",
-                        background=get_color("scrollbar_fg"),
-                        troughcolor=get_color("scrollbar_bg"))
-
-        # LabelFrame
-        style.configure("TLabelframe",
-                        background=bg_main,
-                        foreground=text_primary)
-        style.configure("TLabelframe.Label",
-                        background=bg_main,
-                        foreground=text_primary,
-                        font=font_subheading)
-
-        # Base style
-        style.configure(".", background=bg_main, foreground=text_primary)
+        # ttk styles as (name, configure options, state maps), pushed in one eval
+        styles = [
+            # Frames
+            ("Main.TFrame", {"background": bg_main}, {}),
+            ("Sidebar.TFrame", {"background": bg_sidebar}, {}),
+            ("Card.TFrame", {"background": bg_card, "relief": "flat", "borderwidth": 0}, {}),
+            ("Hover.Card.TFrame", {"background": bg_hover}, {}),
+
+            # Labels
+            ("TLabel", {"background": bg_main, "foreground": text_primary}, {}),
+            ("Heading.TLabel", {"font": font_heading, "foreground": text_primary, "background": bg_main}, {}),
+            ("Subheading.TLabel", {"font": font_subheading, "foreground": text_primary, "background": bg_main}, {}),
+            ("Hint.TLabel", {"font": font_small, "foreground": text_hint, "background": bg_main}, {}),
+
+            # Buttons
+            ("TButton",
+             {"takefocus": 0, "font": font_body, "padding": 6,
+              "background": bg_sidebar, "foreground": text_primary},
+             {"background": [("active", bg_hover), ("pressed", bg_hover)],
+              "foreground": [("disabled", text_disabled)]}),
+            ("Primary.TButton",
+             {"foreground": "white", "background": accent, "font": font_subheading},
+             {"background": [("active", accent_dark), ("pressed", accent_dark)],
+              "foreground": [("disabled", text_disabled)]}),
+            ("Danger.TButton",
+             {"foreground": "white", "background": danger, "font": font_subheading},
+             {"background": [("active", danger_dark), ("pressed", danger_dark)],
+              "foreground": [("disabled", text_disabled)]}),
+            ("Small.TButton",
+             {"font": font_body, "padding": (6, 3), "background": bg_sidebar, "foreground": text_primary},
+             {"background": [("active", bg_hover), ("pressed", bg_hover)],
+              "foreground": [("disabled", text_disabled)]}),
+            ("Small.Primary.TButton",
+             {"font": font_body, "padding": (6, 3), "foreground": "white", "background": accent},
+             {"background": [("active", accent_dark), ("pressed", accent_dark)],
+              "foreground": [("disabled", text_disabled)]}),
+            ("Small.Danger.TButton",
+             {"font": font_body, "padding": (6, 3), "foreground": "white", "background": danger},
+             {"background": [("active", danger_dark), ("pressed", danger_dark)],
+              "foreground": [("disabled", text_disabled)]}),
+
+            # Notebook tabs
+            ("TNotebook", {"background": bg_main, "borderwidth": 0}, {}),
+            ("TNotebook.Tab",
+             {"padding": (20, 10), "font": font_subheading,
+              "background": bg_sidebar, "foreground": text_secondary},
+             {"background": [("selected", bg_card), ("active", bg_hover)],
+              "foreground": [("selected", accent), ("!selected", text_primary)]}),
+
+            # Entry / Input fields
+            ("TEntry",
+             {"fieldbackground": bg_input, "foreground": text_primary, "insertcolor": text_primary}, {}),
+
+            # Spinbox
+            ("TSpinbox",
+             {"fieldbackground": bg_input, "foreground": text_primary, "insertcolor": text_primary,
+              "arrowcolor": text_primary, "background": bg_sidebar}, {}),
+
+            # Combobox
+            ("TCombobox",
+             {"font": font_body, "padding": 4, "fieldbackground": bg_input,
+              "foreground": text_primary, "background": bg_input, "arrowcolor": text_primary},
+             {"fieldbackground": [("readonly", bg_input), ("disabled", bg_sidebar)],
+              "foreground": [("readonly", text_primary), ("disabled", text_disabled)],
+              "background": [("readonly", bg_input)]}),
+
+            # Checkbutton
+            ("TCheckbutton",
+             {"background": bg_main, "foreground": text_primary},
+             {"foreground": [("disabled", text_disabled)],
+              "background": [("disabled", bg_main)]}),
+
+            # Progressbar
+            ("TProgressbar", {"background": accent, "troughcolor": scrollbar_bg}, {}),
+
+            # Separator
+            ("TSeparator", {"background": separator}, {}),
+
+            # ttk Scrollbar
+            ("TScrollbar", {"background": scrollbar_fg, "troughcolor": scrollbar_bg}, {}),
+
+            # LabelFrame
+            ("TLabelframe", {"background": bg_main, "foreground": text_primary}, {}),
+            ("TLabelframe.Label",
+             {"background": bg_main, "foreground": text_primary, "font": font_subheading}, {}),
+
+            # Base style
+            (".", {"background": bg_main, "foreground": text_primary}, {}),
+        ]
+
+        script = []
+        for name, opts, maps in styles:
+            script.append(f"ttk::style configure {name} " + " ".join(
+                f"-{opt} {_tcl_word(value)}" for opt, value in opts.items()))
+            if maps:
+                script.append(f"ttk::style map {name} " + " ".join(
+                    f"-{opt} {{" + " ".join(f"{{{state}}} {_tcl_word(value)}" for state, value in spec) + "}"
+                    for opt, spec in maps.items()))
+        self.root.tk.eval("\n".join(script))
+
+        # Tk option database (pushed to Tcl in a single eval)
+        options = [
+            ("*Font", font_body),
+
+            # Combobox dropdown
+            ("*TCombobox*Listbox.background", bg_input),
+            ("*TCombobox*Listbox.foreground", text_primary),
+            ("*TCombobox*Listbox.selectBackground", accent),
+            ("*TCombobox*Listbox.selectForeground", "white"),
+
+            # Tk widgets
+            ("*Text.background", bg_input),
+            ("*Text.foreground", text_primary),
+            ("*Text.insertBackground", text_primary),
+            ("*Text.selectBackground", accent),
+            ("*Text.selectForeground", "white"),
+
+            ("*Entry.background", bg_input),
+            ("*Entry.foreground", text_primary),
+            ("*Entry.insertBackground", text_primary),
+            ("*Entry.selectBackground", accent),
+            ("*Entry.selectForeground", "white"),
+
+            ("*Spinbox.background", bg_input),
+            ("*Spinbox.foreground", text_primary),
+            ("*Spinbox.insertBackground", text_primary),
+            ("*Spinbox.selectBackground", accent),
+            ("*Spinbox.selectForeground", "white"),
+            ("*Spinbox.buttonBackground", bg_sidebar),
+
+            # Scrollbar
+            ("*Scrollbar.background", scrollbar_fg),
+            ("*Scrollbar.troughColor", scrollbar_bg),
+            ("*Scrollbar.activeBackground", border_dark),
+            ("*Scrollbar.highlightBackground", bg_main),
+            ("*Scrollbar.highlightColor", bg_main),
+        ]
+        self.root.tk.eval("\n".join(
+            f"option add {pattern} {_tcl_word(value)}" for pattern, value in options
+        ))
 
     def _build_ui(self):
         """Build the main user interface with tabs."""
@@ -432,15 +491,45 @@ class ImageBuddyApp:
         self.api_frame = ttk.Frame(self.notebook, style="Main.TFrame")
         self.notebook.add(self.api_frame, text="  API  ")
 
-        # Build each tab
+        # Build the visible tab now; the rest are built on first view
+        self.images_tab = None
+        self.settings_tab = None
+        self.log_tab = None
+        self.api_tab = None
+
+        self._tab_builders = {
+            str(self.images_frame): self._build_images_tab,
+            str(self.settings_frame): self._build_settings_tab,
+            str(self.log_frame): self._build_log_tab,
+            str(self.api_frame): self._build_api_tab,
+        }
+        self._build_selected_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self._build_selected_tab())
+
+    def _build_selected_tab(self):
+        """Build the currently selected tab if it hasn't been built yet."""
+        from ui.ui_utils import tag_canvas_children
+
+        selected = self.notebook.select()
+        builder = self._tab_builders.pop(selected, None)
+        if builder:
+            builder()
+            tag_canvas_children(self.notebook.nametowidget(selected))
+
+    def _build_images_tab(self):
         from ui.images_tab import ImagesTab
-        from ui.settings_tab import SettingsTab
-        from ui.log_tab import LogTab
-        from ui.api_tab import APITab
-
         self.images_tab = ImagesTab(self.images_frame, self.vision_registry)
+
+    def _build_settings_tab(self):
+        from ui.settings_tab import SettingsTab
         self.settings_tab = SettingsTab(self.settings_frame)
+
+    def _build_log_tab(self):
+        from ui.log_tab import LogTab
         self.log_tab = LogTab(self.log_frame)
+
+    def _build_api_tab(self):
+        from ui.api_tab import APITab
         self.api_tab = APITab(self.api_frame, self.api_server)
 
     def _on_close(self):
@@ -460,10 +549,12 @@ class ImageBuddyApp:
         except Exception as e:
             logger.error(f"[App] API server cleanup error: {e}")
 
-        # Shutdown image manager (cancels all downloads)
+        # Shutdown image manager if anything created it (cancels all downloads)
         try:
-            self.image_manager.shutdown()  # Cancel all pending downloads
-            self.image_manager.close()     # Close database
+            manager = ImageManager._instance
+            if manager is not None:
+                manager.shutdown()  # Cancel all pending downloads
+                manager.close()     # Close database
         except Exception as e:
             logger.error(f"[App] Cleanup error: {e}")
 
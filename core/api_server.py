@@ -1,33 +1,187 @@
 # core/api_server.py
 # Flask REST API server for ImageBuddy
 
-import threading
+import asyncio
+import inspect
+import itertools
+import math
 import queue
+import threading
 import time
 import uuid
 import json
 import os
+import zlib
 from pathlib import Path
 from functools import wraps
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
-from flask import Flask, jsonify, request, send_file, Response
+from flask import Flask, jsonify, request, send_file, Response, stream_with_context
+from flask.json.provider import JSONProvider
 from werkzeug.serving import make_server
 
-from core import logger
-from core.image_manager import ImageManager, THUMBS_DIR, ORIGINALS_DIR
+try:
+    import orjson
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from core import logger, system_monitor
+from core.image_manager import ImageManager, PROJECT_ROOT, THUMBS_DIR, ORIGINALS_DIR
+from core.batch_scheduler import BatchScheduler
+from core.vision_manager import VisionManager
+
+
+# Seconds a computed /api/v1/stats payload is reused (reset early on insert/delete)
+STATS_CACHE_TTL = 30
+
+# Concurrent downloads per /api/v1/download/batch task
+BATCH_DOWNLOAD_CONCURRENCY = 16
+
+# Cache-Control max-age (seconds) for served originals/thumbnails; files never change in place
+IMAGE_MAX_AGE = 3600
+
+# Max thumbnails returned by one /api/v1/images/thumbs call
+THUMBS_BATCH_MAX = 500
+
+# Worst-case vision time per image (seconds); waits scale it by the images queued per instance
+ANALYSIS_TIMEOUT = 60
+
+# Analysis results written per transaction in long-running analyze tasks
+ANALYSIS_COMMIT_BATCH = 50
+
+# Finished tasks stay pollable this long (seconds) after they finish
+TASK_RETENTION = 3600
+
+# CPU-mode analysis backs off between batches only while system CPU use is at least this (%)
+CPU_THROTTLE_PERCENT = 90
+
+# Existence checks list a directory once (instead of stat per file) from this many files in it
+SCANDIR_MIN_FILES = 64
+
+
+def _dir_total_bytes(path: Path) -> int:
+    """Total size of the regular files directly inside a directory.
+
+    os.scandir entries carry their file type from the directory listing, and on
+    Windows their stat data too, so this avoids Path.glob + is_file + stat per file.
+    """
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+    except FileNotFoundError:
+        pass
+    return total
+
+
+def _existing_paths(paths: list) -> set:
+    """The subset of `paths` that exist.
+
+    A directory holding at least SCANDIR_MIN_FILES of the paths is listed once
+    with os.scandir; the rest are checked with os.path.exists.
+    """
+    by_dir = {}
+    for path in paths:
+        by_dir.setdefault(os.path.dirname(path), []).append(path)
+
+    found = set()
+    for directory, group in by_dir.items():
+        if len(group) < SCANDIR_MIN_FILES:
+            found.update(p for p in group if os.path.exists(p))
+            continue
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries}
+        except OSError:
+            continue
+        found.update(p for p in group if os.path.basename(p) in names)
+    return found
+
+
+def _unique_by_url(items: list) -> list:
+    """Drop items whose 'url' already appeared earlier (merged search pages repeat images)."""
+    seen = set()
+    unique = []
+    for item in items:
+        url = item.get('url')
+        if url not in seen:
+            seen.add(url)
+            unique.append(item)
+    return unique
+
+
+def _stream_compressor(accept_encodings):
+    """Pick a streaming compressor for the client's Accept-Encoding.
+
+    Returns (encoding, compress, finish), or (None, None, None) for identity.
+    """
+    if zstandard is not None and accept_encodings['zstd']:
+        c = zstandard.ZstdCompressor(level=3).compressobj()
+        return 'zstd', c.compress, c.flush
+    if brotli is not None and accept_encodings['br']:
+        c = brotli.Compressor(quality=4)
+        return 'br', c.process, c.finish
+    if accept_encodings['gzip']:
+        c = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return 'gzip', c.compress, c.flush
+    return None, None, None
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=str).encode()
+
+
+def _loads(data):
+    """Parse JSON text or bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (used by every jsonify call)."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 
 class APIServer:
     """Thread-safe Flask API server for ImageBuddy."""
 
-    def __init__(self, image_manager: ImageManager, vision_registry, host='127.0.0.1', port=5000):
-        self.image_manager = image_manager
+    def __init__(self, image_manager: ImageManager | None, vision_registry, host='127.0.0.1', port=5000,
+                 batch_size=8, batch_wait_ms=20):
+        self._image_manager = image_manager  # None = use the singleton on first request
+        self._root = str(PROJECT_ROOT)  # Plain str for os.path joins on the file-serving paths
         self.vision_registry = vision_registry
         self.host = host
         self.port = port
 
         self.app = Flask(__name__)
         self.app.config['JSON_SORT_KEYS'] = False
+        if orjson is not None:
+            self.app.json = OrjsonProvider(self.app)
 
         self.server = None
         self.server_thread = None
@@ -36,18 +190,37 @@ class APIServer:
 
         # Task tracking for async operations
         self.tasks = {}
-        self.task_lock = threading.Lock()
+        self.task_lock = threading.Lock()  # Guards task creation and updates; reads are lock-free
+        self._task_counter = itertools.count(1)
+        self._started_ns = time.time_ns()
+
+        # Async tasks: one asyncio.Queue + worker per task type on the ImageManager loop
+        self._task_queues = {}
+        self._task_workers = []
+        self._task_loop = None
+
+        # Task type -> handler; coroutine handlers run on the loop, the rest in its executor
+        self._task_handlers = {
+            'search_download': self._process_search_download,
+            'smart_analyze': self._process_smart_analyze,
+            'search_download_analyze': self._process_search_download_analyze,
+        }
 
-        # Background worker for async tasks
-        self.task_queue = queue.Queue()
-        self.worker_thread = None
-        self.worker_running = False
+        # /api/v1/stats payload: (expiry, image_manager.data_version, payload)
+        self._stats_cache = (0.0, -1, None)
 
-        # Vision lock for thread-safe access
-        self.vision_lock = threading.Lock()
+        # Coalesces concurrent single-image analyses into batched worker calls
+        self.batch_scheduler = BatchScheduler(vision_registry, batch_size, batch_wait_ms)
 
         self._register_routes()
 
+    @property
+    def image_manager(self) -> ImageManager:
+        """Image manager, constructed on first use if none was passed in."""
+        if self._image_manager is None:
+            self._image_manager = ImageManager()
+        return self._image_manager
+
     def _register_routes(self):
         """Register all API endpoints."""
 
@@ -71,38 +244,26 @@ class APIServer:
         def stats():
             """Get image statistics."""
             try:
-                images = self.image_manager.get_all_images()
-
-                # Count by source
-                by_source = {}
-                by_query = {}
-                total_size = 0
+                manager = self.image_manager
+                expiry, version, payload = self._stats_cache
+                if payload is not None and version == manager.data_version and time.monotonic() < expiry:
+                    return jsonify(payload)
 
-                for img in images:
-                    source = img.get('source', 'Unknown')
-                    by_source[source] = by_source.get(source, 0) + 1
-
-                    query = img.get('query', 'Unknown')
-                    by_query[query] = by_query.get(query, 0) + 1
+                version = manager.data_version
+                data = manager.get_stats()
 
                 # Disk usage
-                originals_size = sum(f.stat().st_size for f in ORIGINALS_DIR.glob('*') if f.is_file())
-                thumbs_size = sum(f.stat().st_size for f in THUMBS_DIR.glob('*') if f.is_file())
+                originals_size = _dir_total_bytes(ORIGINALS_DIR)
+                thumbs_size = _dir_total_bytes(THUMBS_DIR)
+                data['disk_usage'] = {
+                    'originals_mb': round(originals_size / 1024 / 1024, 2),
+                    'thumbs_mb': round(thumbs_size / 1024 / 1024, 2),
+                    'total_mb': round((originals_size + thumbs_size) / 1024 / 1024, 2)
+                }
 
-                return jsonify({
-                    'success': True,
-                    'data': {
-                        'total_images': len(images),
-                        'by_source': by_source,
-                        'by_query': dict(sorted(by_query.items(), key=lambda x: x[1], reverse=True)[:20]),
-                        'vision_processed': sum(1 for img in images if img.get('vision_processed')),
-                        'disk_usage': {
-                            'originals_mb': round(originals_size / 1024 / 1024, 2),
-                            'thumbs_mb': round(thumbs_size / 1024 / 1024, 2),
-                            'total_mb': round((originals_size + thumbs_size) / 1024 / 1024, 2)
-                        }
-                    }
-                })
+                payload = {'success': True, 'data': data}
+                self._stats_cache = (time.monotonic() + STATS_CACHE_TTL, version, payload)
+                return jsonify(payload)
             except Exception as e:
                 logger.error(f"[API] Stats error: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
@@ -121,52 +282,36 @@ class APIServer:
 
                 per_page = min(per_page, 500)  # Cap at 500
 
-                images = self.image_manager.get_all_images()
-
-                # Apply filters
-                if source:
-                    images = [img for img in images if img.get('source', '').lower() == source.lower()]
-                if query_filter:
-                    images = [img for img in images if query_filter.lower() in img.get('query', '').lower()]
+                filters = {'source': source, 'query': query_filter}
                 if vision_processed:
-                    vp = vision_processed.lower() == 'true'
-                    images = [img for img in images if bool(img.get('vision_processed')) == vp]
+                    filters['vision_processed'] = vision_processed.lower() == 'true'
 
-                # Pagination
-                total = len(images)
+                # Filtering and pagination run in SQL
+                paginated, total = self.image_manager.query_images(
+                    filters, limit=per_page, offset=(page - 1) * per_page
+                )
                 total_pages = (total + per_page - 1) // per_page
-                start = (page - 1) * per_page
-                end = start + per_page
-                paginated = images[start:end]
 
-                return jsonify({
-                    'success': True,
-                    'data': {
-                        'images': paginated,
-                        'total': total,
-                        'page': page,
-                        'per_page': per_page,
-                        'total_pages': total_pages
-                    }
-                })
+                return self._json_page(
+                    paginated, total=total, page=page, per_page=per_page, total_pages=total_pages
+                )
             except Exception as e:
                 logger.error(f"[API] Get images error: {e}")
-                return jsonify({'success': False, 'error': str(e)}), 500
+                return self._json({'success': False, 'error': str(e)}, 500)
 
         @self.app.route('/api/v1/images/<image_id>')
         def get_image(image_id):
             """Get single image by ID."""
             try:
-                images = self.image_manager.get_all_images()
-                image = next((img for img in images if img.get('id') == image_id), None)
+                image = self.image_manager.get_image_by_id(image_id)
 
                 if not image:
-                    return jsonify({'success': False, 'error': 'Image not found'}), 404
+                    return self._json({'success': False, 'error': 'Image not found'}, 404)
 
-                return jsonify({'success': True, 'data': image})
+                return self._json({'success': True, 'data': image})
             except Exception as e:
                 logger.error(f"[API] Get image error: {e}")
-                return jsonify({'success': False, 'error': str(e)}), 500
+                return self._json({'success': False, 'error': str(e)}, 500)
 
         @self.app.route('/api/v1/images/<image_id>', methods=['DELETE'])
         def delete_image(image_id):
@@ -208,32 +353,23 @@ class APIServer:
             try:
                 data = request.get_json() or {}
 
-                updates = []
-                values = []
+                fields = {}
 
                 if 'tags' in data:
                     tags = data['tags'] if isinstance(data['tags'], list) else []
-                    updates.append('tags = ?')
-                    values.append(json.dumps(tags))
+                    fields['tags'] = _dumps(tags).decode()
 
                 if 'alt' in data:
-                    updates.append('alt = ?')
-                    values.append(data['alt'])
+                    fields['alt'] = data['alt']
 
-                if not updates:
+                if not fields:
                     return jsonify({'success': False, 'error': 'No updates provided'}), 400
 
-                values.append(image_id)
-                sql = f"UPDATE images SET {', '.join(updates)} WHERE id = ?"
-
-                with self.image_manager.conn:
-                    cursor = self.image_manager.conn.execute(sql, values)
-                    if cursor.rowcount == 0:
-                        return jsonify({'success': False, 'error': 'Image not found'}), 404
+                if self.image_manager.update_image_fields(image_id, fields) == 0:
+                    return jsonify({'success': False, 'error': 'Image not found'}), 404
 
                 # Return updated image
-                images = self.image_manager.get_all_images()
-                image = next((img for img in images if img.get('id') == image_id), None)
+                image = self.image_manager.get_image_by_id(image_id)
 
                 return jsonify({'success': True, 'data': image})
             except Exception as e:
@@ -244,20 +380,16 @@ class APIServer:
         def get_image_file(image_id):
             """Serve original image file."""
             try:
-                images = self.image_manager.get_all_images()
-                image = next((img for img in images if img.get('id') == image_id), None)
+                image = self.image_manager.get_image_by_id(image_id)
 
                 if not image:
                     return jsonify({'success': False, 'error': 'Image not found'}), 404
 
                 path = image.get('path', '')
                 if path:
-                    full_path = Path(path)
-                    if not full_path.is_absolute():
-                        full_path = Path(__file__).parent.parent / path
-
-                    if full_path.exists():
-                        return send_file(full_path, mimetype='image/jpeg')
+                    full_path = path if os.path.isabs(path) else os.path.join(self._root, path)
+                    if os.path.exists(full_path):
+                        return send_file(full_path, mimetype='image/jpeg', conditional=True, etag=True, max_age=IMAGE_MAX_AGE)
 
                 # Fall back to thumbnail
                 return get_image_thumb(image_id)
@@ -269,26 +401,59 @@ class APIServer:
         def get_image_thumb(image_id):
             """Serve thumbnail."""
             try:
-                images = self.image_manager.get_all_images()
-                image = next((img for img in images if img.get('id') == image_id), None)
+                image = self.image_manager.get_image_by_id(image_id)
 
                 if not image:
                     return jsonify({'success': False, 'error': 'Image not found'}), 404
 
                 thumb_path = image.get('thumb_path', '')
                 if thumb_path:
-                    full_path = Path(thumb_path)
-                    if not full_path.is_absolute():
-                        full_path = Path(__file__).parent.parent / thumb_path
-
-                    if full_path.exists():
-                        return send_file(full_path, mimetype='image/jpeg')
+                    full_path = thumb_path if os.path.isabs(thumb_path) else os.path.join(self._root, thumb_path)
+                    if os.path.exists(full_path):
+                        return send_file(full_path, mimetype='image/jpeg', conditional=True, etag=True, max_age=IMAGE_MAX_AGE)
 
                 return jsonify({'success': False, 'error': 'Thumbnail not found'}), 404
             except Exception as e:
                 logger.error(f"[API] Get thumb error: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
 
+        @self.app.route('/api/v1/images/thumbs', methods=['POST'])
+        def get_image_thumbs():
+            """Serve many thumbnails in one multipart/mixed response (one part per found ID)."""
+            try:
+                data = request.get_json() or {}
+                image_ids = data.get('ids', [])[:THUMBS_BATCH_MAX]
+
+                if not image_ids:
+                    return jsonify({'success': False, 'error': 'No image IDs provided'}), 400
+
+                thumb_paths = self.image_manager.get_thumb_paths(image_ids)
+                boundary = uuid.uuid4().hex
+
+                def generate():
+                    for image_id in image_ids:
+                        thumb_path = thumb_paths.get(image_id)
+                        if not thumb_path:
+                            continue
+                        full_path = thumb_path if os.path.isabs(thumb_path) else os.path.join(self._root, thumb_path)
+                        try:
+                            with open(full_path, 'rb') as f:
+                                body = f.read()
+                        except OSError:
+                            continue
+                        yield (
+                            f"--{boundary}\r\n"
+                            f"Content-Type: image/jpeg\r\n"
+                            f"Content-ID: <{image_id}>\r\n"
+                            f"Content-Length: {len(body)}\r\n\r\n"
+                        ).encode() + body + b"\r\n"
+                    yield f"--{boundary}--\r\n".encode()
+
+                return Response(generate(), content_type=f'multipart/mixed; boundary={boundary}')
+            except Exception as e:
+                logger.error(f"[API] Get thumbs error: {e}")
+                return jsonify({'success': False, 'error': str(e)}), 500
+
         @self.app.route('/api/v1/images/query', methods=['POST'])
         def query_images():
             """Advanced image query with multiple filters."""
@@ -298,75 +463,25 @@ class APIServer:
                 sort = data.get('sort', {'field': 'downloaded_at', 'order': 'desc'})
                 pagination = data.get('pagination', {'page': 1, 'per_page': 50})
 
-                images = self.image_manager.get_all_images()
-
-                # Apply filters
-                if filters.get('source'):
-                    sources = filters['source'] if isinstance(filters['source'], list) else [filters['source']]
-                    sources_lower = [s.lower() for s in sources]
-                    images = [img for img in images if img.get('source', '').lower() in sources_lower]
-
-                if filters.get('query'):
-                    q = filters['query'].lower()
-                    images = [img for img in images if q in img.get('query', '').lower()]
-
-                if filters.get('tags_contain'):
-                    tags_filter = filters['tags_contain']
-                    if isinstance(tags_filter, str):
-                        tags_filter = [tags_filter]
-                    def has_tags(img):
-                        try:
-                            img_tags = json.loads(img.get('tags', '[]'))
-                            img_tags_lower = [t.lower() for t in img_tags]
-                            return any(t.lower() in img_tags_lower for t in tags_filter)
-                        except:
-                            return False
-                    images = [img for img in images if has_tags(img)]
-
-                if filters.get('width_min'):
-                    images = [img for img in images if (img.get('width') or 0) >= filters['width_min']]
-                if filters.get('width_max'):
-                    images = [img for img in images if (img.get('width') or 0) <= filters['width_max']]
-                if filters.get('height_min'):
-                    images = [img for img in images if (img.get('height') or 0) >= filters['height_min']]
-                if filters.get('height_max'):
-                    images = [img for img in images if (img.get('height') or 0) <= filters['height_max']]
-
-                if 'vision_processed' in filters:
-                    vp = filters['vision_processed']
-                    images = [img for img in images if bool(img.get('vision_processed')) == vp]
-
-                if 'preview_only' in filters:
-                    po = filters['preview_only']
-                    images = [img for img in images if bool(img.get('preview_only')) == po]
-
-                # Sorting
-                sort_field = sort.get('field', 'downloaded_at')
-                sort_order = sort.get('order', 'desc')
-                reverse = sort_order.lower() == 'desc'
-                images.sort(key=lambda x: x.get(sort_field, ''), reverse=reverse)
-
-                # Pagination
                 page = pagination.get('page', 1)
                 per_page = min(pagination.get('per_page', 50), 500)
-                total = len(images)
+
+                # Filtering, sorting and pagination run in SQL
+                paginated, total = self.image_manager.query_images(
+                    filters,
+                    sort_field=sort.get('field', 'downloaded_at'),
+                    sort_order=sort.get('order', 'desc'),
+                    limit=per_page,
+                    offset=(page - 1) * per_page
+                )
                 total_pages = (total + per_page - 1) // per_page
-                start = (page - 1) * per_page
-                paginated = images[start:start + per_page]
 
-                return jsonify({
-                    'success': True,
-                    'data': {
-                        'images': paginated,
-                        'total': total,
-                        'page': page,
-                        'per_page': per_page,
-                        'total_pages': total_pages
-                    }
-                })
+                return self._json_page(
+                    paginated, total=total, page=page, per_page=per_page, total_pages=total_pages
+                )
             except Exception as e:
                 logger.error(f"[API] Query images error: {e}")
-                return jsonify({'success': False, 'error': str(e)}), 500
+                return self._json({'success': False, 'error': str(e)}, 500)
 
         # ========== SEARCH ==========
 
@@ -396,27 +511,17 @@ class APIServer:
                 if not query:
                     return jsonify({'success': False, 'error': 'Query required'}), 400
 
-                # Run search
-                import asyncio
-                import aiohttp
-
-                async def do_search():
-                    return await self.image_manager.search_all(query, sources)
-
-                future = self.image_manager.schedule(do_search())
-                if future:
-                    results = future.result(timeout=60)
-                    return jsonify({
-                        'success': True,
-                        'data': {
-                            'results': results,
-                            'count': len(results),
-                            'query': query
-                        }
-                    })
-                else:
+                # Stream each source page's results as it arrives
+                pages = self._iter_on_loop(self.image_manager.iter_search_all(query, sources), timeout=60)
+                if pages is None:
                     return jsonify({'success': False, 'error': 'Search failed to schedule'}), 500
 
+                return self._json_stream(
+                    'results',
+                    itertools.chain.from_iterable(pages),
+                    lambda count: {'count': count, 'query': query}
+                )
+
             except Exception as e:
                 logger.error(f"[API] Search all error: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
@@ -443,14 +548,11 @@ class APIServer:
                     return jsonify({'success': False, 'error': 'Image already exists'}), 409
 
                 # Download
-                import asyncio
-                import aiohttp
-
                 async def do_download():
-                    async with aiohttp.ClientSession() as session:
-                        return await self.image_manager.download_and_save(
-                            session, url, tags, source, query, alt, preview_only
-                        )
+                    session = await self.image_manager.get_session()
+                    return await self.image_manager.download_and_save(
+                        session, url, tags, source, query, alt, preview_only
+                    )
 
                 future = self.image_manager.schedule(do_download())
                 if future:
@@ -480,13 +582,8 @@ class APIServer:
                 # Create task
                 task_id = self._create_task('download_batch', len(items))
 
-                # Queue the work
-                self.task_queue.put({
-                    'type': 'download_batch',
-                    'task_id': task_id,
-                    'items': items,
-                    'preview_only': preview_only
-                })
+                # Downloads run concurrently on the ImageManager loop
+                self._schedule_task(task_id, self._run_download_batch(task_id, items, preview_only))
 
                 return jsonify({
                     'success': True,
@@ -503,11 +600,10 @@ class APIServer:
         @self.app.route('/api/v1/tasks/<task_id>')
         def get_task_status(task_id):
             """Get async task status."""
-            with self.task_lock:
-                task = self.tasks.get(task_id)
-                if not task:
-                    return jsonify({'success': False, 'error': 'Task not found'}), 404
-                return jsonify({'success': True, 'data': task})
+            task = self.tasks.get(task_id)  # Snapshot; _update_task swaps in new dicts
+            if not task:
+                return self._json({'success': False, 'error': 'Task not found'}, 404)
+            return self._json({'success': True, 'data': task})
 
         # ========== VISION ==========
 
@@ -515,9 +611,8 @@ class APIServer:
         def vision_status():
             """Get vision engine status."""
             try:
-                with self.vision_lock:
-                    total = self.vision_registry.get_count()
-                    loaded = self.vision_registry.get_loaded_count()
+                total = self.vision_registry.get_count()
+                loaded = self.vision_registry.get_loaded_count()
 
                 return jsonify({
                     'success': True,
@@ -539,7 +634,6 @@ class APIServer:
                 device = data.get('device', 'cpu')
                 count = data.get('count', 1)
 
-                from core.vision_manager import VisionManager
 
                 loaded = 0
                 for _ in range(count):
@@ -554,8 +648,7 @@ class APIServer:
 
                     manager.load(device_spec)
 
-                    with self.vision_lock:
-                        self.vision_registry.add(manager)
+                    self.vision_registry.add(manager)
                     loaded += 1
 
                 return jsonify({
@@ -573,8 +666,7 @@ class APIServer:
         def vision_unload():
             """Unload all vision instances."""
             try:
-                with self.vision_lock:
-                    self.vision_registry.unload_all()
+                self.vision_registry.unload_all()
 
                 return jsonify({
                     'success': True,
@@ -594,8 +686,7 @@ class APIServer:
                 auto_load = data.get('auto_load', True)  # Auto-load if no instances
 
                 # Get image
-                images = self.image_manager.get_all_images()
-                image = next((img for img in images if img.get('id') == image_id), None)
+                image = self.image_manager.get_image_by_id(image_id)
 
                 if not image:
                     return jsonify({'success': False, 'error': 'Image not found'}), 404
@@ -605,41 +696,30 @@ class APIServer:
                 if not path:
                     return jsonify({'success': False, 'error': 'No image file found'}), 404
 
-                full_path = Path(path)
-                if not full_path.is_absolute():
-                    full_path = Path(__file__).parent.parent / path
-
-                if not full_path.exists():
+                full_path = path if os.path.isabs(path) else os.path.join(self._root, path)
+                if not os.path.exists(full_path):
                     return jsonify({'success': False, 'error': 'Image file not found'}), 404
 
-                # Get a loaded instance, auto-load if needed
-                with self.vision_lock:
-                    instances = [m for m in self.vision_registry.instances if m.is_loaded()]
-
-                if not instances:
+                # Check vision instances, auto-load if needed (lock-free read; the
+                # batch scheduler hands the work to whichever instance is idle)
+                if self.vision_registry.get_loaded_count() == 0:
                     if auto_load:
                         logger.info("[API] No vision instances loaded, auto-loading...")
                         load_result = self._auto_load_vision()
                         if not load_result['success']:
                             return jsonify({'success': False, 'error': load_result['message']}), 500
-                        with self.vision_lock:
-                            instances = [m for m in self.vision_registry.instances if m.is_loaded()]
                     else:
                         return jsonify({'success': False, 'error': 'No vision instances loaded'}), 400
 
-                manager = instances[0]
-
-                # Synchronous analysis with event
-                result_event = threading.Event()
-                result_data = {}
-
-                def callback(data):
-                    result_data.update(data)
-                    result_event.set()
+                # Batched with any other single-image requests arriving now
+                future = self.batch_scheduler.submit(full_path, need_objects)
 
-                manager.send_analysis(str(full_path), callback, need_objects, direct_callback=True)
+                try:
+                    result_data = future.result(timeout=60)
+                except FutureTimeoutError:
+                    result_data = None
 
-                if result_event.wait(timeout=60):
+                if result_data is not None:
                     if 'error' in result_data:
                         return jsonify({'success': False, 'error': result_data['error']}), 500
 
@@ -647,21 +727,15 @@ class APIServer:
 
                     # Apply to database if requested
                     if apply_to_db and analysis:
-                        updates = ['vision_processed = 1']
-                        values = []
+                        fields = {'vision_processed': 1}
 
                         if analysis.get('caption'):
-                            updates.append('alt = ?')
-                            values.append(analysis['caption'])
+                            fields['alt'] = analysis['caption']
 
                         if analysis.get('objects'):
-                            updates.append('tags = ?')
-                            values.append(json.dumps(analysis['objects']))
+                            fields['tags'] = _dumps(analysis['objects']).decode()
 
-                        values.append(image_id)
-                        sql = f"UPDATE images SET {', '.join(updates)} WHERE id = ?"
-                        with self.image_manager.conn:
-                            self.image_manager.conn.execute(sql, values)
+                        self.image_manager.update_image_fields(image_id, fields)
 
                     return jsonify({
                         'success': True,
@@ -691,8 +765,7 @@ class APIServer:
                     return jsonify({'success': False, 'error': 'No image IDs provided'}), 400
 
                 # Check vision instances, auto-load if needed
-                with self.vision_lock:
-                    loaded = self.vision_registry.get_loaded_count()
+                loaded = self.vision_registry.get_loaded_count()
 
                 if loaded == 0:
                     if auto_load:
@@ -706,13 +779,8 @@ class APIServer:
                 # Create task
                 task_id = self._create_task('vision_analyze', len(image_ids))
 
-                # Queue the work
-                self.task_queue.put({
-                    'type': 'vision_analyze',
-                    'task_id': task_id,
-                    'image_ids': image_ids,
-                    'need_objects': need_objects
-                })
+                # Analyses are spread across loaded instances on the ImageManager loop
+                self._schedule_task(task_id, self._run_vision_analyze(task_id, image_ids, need_objects))
 
                 return jsonify({
                     'success': True,
@@ -745,7 +813,7 @@ class APIServer:
                 task_id = self._create_task('search_download', limit)
 
                 # Queue the work
-                self.task_queue.put({
+                self._submit_task({
                     'type': 'search_download',
                     'task_id': task_id,
                     'query': query,
@@ -781,8 +849,7 @@ class APIServer:
                     return jsonify({'success': False, 'error': 'URL required'}), 400
 
                 # Check vision, auto-load if needed
-                with self.vision_lock:
-                    loaded = self.vision_registry.get_loaded_count()
+                loaded = self.vision_registry.get_loaded_count()
 
                 if loaded == 0:
                     if auto_load:
@@ -794,13 +861,11 @@ class APIServer:
                         return jsonify({'success': False, 'error': 'No vision instances loaded'}), 400
 
                 # Download first
-                import aiohttp
-
                 async def do_download():
-                    async with aiohttp.ClientSession() as session:
-                        return await self.image_manager.download_and_save(
-                            session, url, tags, source, query, alt, False
-                        )
+                    session = await self.image_manager.get_session()
+                    return await self.image_manager.download_and_save(
+                        session, url, tags, source, query, alt, False
+                    )
 
                 future = self.image_manager.schedule(do_download())
                 if not future:
@@ -825,11 +890,10 @@ class APIServer:
 
                 full_path = Path(path)
                 if not full_path.is_absolute():
-                    full_path = Path(__file__).parent.parent / path
+                    full_path = PROJECT_ROOT / path
 
                 # Analyze
-                with self.vision_lock:
-                    instances = [m for m in self.vision_registry.instances if m.is_loaded()]
+                instances = self.vision_registry.get_loaded()
 
                 if not instances:
                     return jsonify({
@@ -841,37 +905,26 @@ class APIServer:
                         }
                     })
 
-                manager = instances[0]
-                result_event = threading.Event()
-                analysis_data = {}
-
-                def callback(data):
-                    analysis_data.update(data)
-                    result_event.set()
+                # Goes to whichever loaded instance is idle, not always the first
+                future = self.batch_scheduler.submit(str(full_path), True)
+                try:
+                    analysis_data = future.result(timeout=60)
+                except FutureTimeoutError:
+                    analysis_data = None
 
-                manager.send_analysis(str(full_path), callback, True, direct_callback=True)
-
-                if result_event.wait(timeout=60):
+                if analysis_data is not None:
                     analysis = analysis_data.get('analysis', {})
 
                     # Apply to DB
                     if analysis:
-                        updates = ['vision_processed = 1']
-                        values = []
-                        if analysis.get('caption'):
-                            updates.append('alt = ?')
-                            values.append(analysis['caption'])
-                        if analysis.get('objects'):
-                            updates.append('tags = ?')
-                            values.append(json.dumps(analysis['objects']))
-                        values.append(image_id)
-                        sql = f"UPDATE images SET {', '.join(updates)} WHERE id = ?"
-                        with self.image_manager.conn:
-                            self.image_manager.conn.execute(sql, values)
+                        self.image_manager.apply_analysis_batch([(
+                            analysis.get('caption') or None,
+                            _dumps(analysis['objects']).decode() if analysis.get('objects') else None,
+                            image_id
+                        )])
 
                     # Get updated image
-                    images = self.image_manager.get_all_images()
-                    updated_image = next((img for img in images if img.get('id') == image_id), result)
+                    updated_image = self.image_manager.get_image_by_id(image_id) or result
 
                     return jsonify({
                         'success': True,
@@ -904,8 +957,7 @@ class APIServer:
                 auto_load = data.get('auto_load', True)  # Auto-load if no instances
 
                 # Check vision, auto-load if needed
-                with self.vision_lock:
-                    loaded = self.vision_registry.get_loaded_count()
+                loaded = self.vision_registry.get_loaded_count()
 
                 if loaded == 0:
                     if auto_load:
@@ -917,14 +969,7 @@ class APIServer:
                         return jsonify({'success': False, 'error': 'No vision instances loaded'}), 400
 
                 # Get unprocessed images
-                images = self.image_manager.get_all_images()
-                unprocessed = [img for img in images if not img.get('vision_processed')]
-
-                if sources:
-                    sources_lower = [s.lower() for s in sources]
-                    unprocessed = [img for img in unprocessed if img.get('source', '').lower() in sources_lower]
-
-                unprocessed = unprocessed[:limit]
+                unprocessed = self.image_manager.query_unprocessed(sources, limit)
 
                 if not unprocessed:
                     return jsonify({
@@ -940,13 +985,8 @@ class APIServer:
                 # Create task
                 task_id = self._create_task('vision_analyze', len(image_ids))
 
-                # Queue the work
-                self.task_queue.put({
-                    'type': 'vision_analyze',
-                    'task_id': task_id,
-                    'image_ids': image_ids,
-                    'need_objects': True
-                })
+                # Analyses are spread across loaded instances on the ImageManager loop
+                self._schedule_task(task_id, self._run_vision_analyze(task_id, image_ids, True))
 
                 return jsonify({
                     'success': True,
@@ -993,41 +1033,14 @@ class APIServer:
                 reprocess_few_tags = data.get('reprocess_few_tags', False)
 
                 # Get images to process
-                all_images = self.image_manager.get_all_images()
-
                 if image_ids:
                     # Use specified IDs
-                    images_to_process = [img for img in all_images if img['id'] in image_ids]
+                    images_to_process = self.image_manager.get_images_by_ids(image_ids)[:limit]
                 else:
                     # Find unprocessed or matching reprocess criteria
-                    images_to_process = []
-                    for img in all_images:
-                        should_process = False
-
-                        if not img.get('vision_processed'):
-                            should_process = True
-                        elif reprocess_short:
-                            caption = img.get('alt') or ''
-                            if len(caption) < 50:
-                                should_process = True
-                        elif reprocess_few_tags:
-                            try:
-                                tags = json.loads(img.get('tags') or '[]')
-                                if len(tags) <= 1:
-                                    should_process = True
-                            except:
-                                should_process = True
-
-                        if should_process:
-                            # Apply source filter
-                            if sources:
-                                sources_lower = [s.lower() for s in sources]
-                                if img.get('source', '').lower() in sources_lower:
-                                    images_to_process.append(img)
-                            else:
-                                images_to_process.append(img)
-
-                images_to_process = images_to_process[:limit]
+                    images_to_process = self.image_manager.query_unprocessed(
+                        sources, limit, reprocess_short, reprocess_few_tags
+                    )
 
                 if not images_to_process:
                     return jsonify({
@@ -1040,8 +1053,7 @@ class APIServer:
                     })
 
                 # Check/load vision instances
-                with self.vision_lock:
-                    loaded_count = self.vision_registry.get_loaded_count()
+                loaded_count = self.vision_registry.get_loaded_count()
 
                 load_info = None
                 if loaded_count == 0:
@@ -1055,7 +1067,7 @@ class APIServer:
                 task_id = self._create_task('smart_analyze', len(images_to_process))
 
                 # Queue the work
-                self.task_queue.put({
+                self._submit_task({
                     'type': 'smart_analyze',
                     'task_id': task_id,
                     'images': images_to_process,
@@ -1114,7 +1126,7 @@ class APIServer:
                 task_id = self._create_task('search_download_analyze', limit)
 
                 # Queue the work
-                self.task_queue.put({
+                self._submit_task({
                     'type': 'search_download_analyze',
                     'task_id': task_id,
                     'query': query,
@@ -1146,31 +1158,23 @@ class APIServer:
             if not query:
                 return jsonify({'success': False, 'error': 'Query required'}), 400
 
-            import aiohttp
-
             async def do_search():
-                async with aiohttp.ClientSession() as session:
-                    if source == 'pixabay':
-                        return await self.image_manager.search_pixabay(session, query, page, per_page or 200)
-                    elif source == 'pexels':
-                        return await self.image_manager.search_pexels(session, query, page, per_page or 80)
-                    elif source == 'unsplash':
-                        return await self.image_manager.search_unsplash(session, query, page, per_page or 30)
-                    return []
+                session = await self.image_manager.get_session()
+                if source == 'pixabay':
+                    return await self.image_manager.search_pixabay(session, query, page, per_page or 200)
+                elif source == 'pexels':
+                    return await self.image_manager.search_pexels(session, query, page, per_page or 80)
+                elif source == 'unsplash':
+                    return await self.image_manager.search_unsplash(session, query, page, per_page or 30)
+                return []
 
             future = self.image_manager.schedule(do_search())
             if future:
                 results = future.result(timeout=30)
-                return jsonify({
-                    'success': True,
-                    'data': {
-                        'results': results,
-                        'count': len(results),
-                        'source': source,
-                        'query': query,
-                        'page': page
-                    }
-                })
+                return self._json_stream(
+                    'results', results,
+                    lambda count: {'count': count, 'source': source, 'query': query, 'page': page}
+                )
             else:
                 return jsonify({'success': False, 'error': 'Search failed'}), 500
 
@@ -1180,8 +1184,16 @@ class APIServer:
 
     def _create_task(self, task_type: str, total: int) -> str:
         """Create a new tracked task."""
-        task_id = str(uuid.uuid4())
+        # Process-unique; the start-time suffix keeps ids distinct across restarts
+        task_id = f"t{next(self._task_counter):x}-{self._started_ns:x}"
+        now = time.time()
         with self.task_lock:
+            # Drop tasks finished long ago so the registry doesn't grow for the server's lifetime
+            cutoff = now - TASK_RETENTION
+            for old_id, task in list(self.tasks.items()):
+                if task['status'] != 'running' and task.get('finished_at', task['created_at']) < cutoff:
+                    del self.tasks[old_id]
+
             self.tasks[task_id] = {
                 'id': task_id,
                 'type': task_type,
@@ -1189,16 +1201,119 @@ class APIServer:
                 'total': total,
                 'completed': 0,
                 'errors': [],
-                'created_at': time.time(),
+                'created_at': now,
                 'result': None
             }
         return task_id
 
     def _update_task(self, task_id: str, **kwargs):
-        """Update task status."""
+        """Update task status.
+
+        The entry is replaced with an updated copy in one dict store, so readers
+        always see a complete snapshot without locking. The copy is made under
+        task_lock because a task can have several writers (e.g. download
+        progress from the ImageManager loop while its handler sets the phase).
+        """
         with self.task_lock:
-            if task_id in self.tasks:
-                self.tasks[task_id].update(kwargs)
+            task = self.tasks.get(task_id)
+            if task is not None:
+                # Retention counts from completion, so long runs stay pollable afterwards
+                if kwargs.get('status') in ('completed', 'failed') and 'finished_at' not in task:
+                    kwargs['finished_at'] = time.time()
+                self.tasks[task_id] = {**task, **kwargs}
+
+    def _json(self, obj, status: int = 200) -> Response:
+        """Build a JSON response, passing orjson bytes straight to the body."""
+        return Response(_dumps(obj), status=status, mimetype='application/json')
+
+    def _json_page(self, images: list, **meta) -> Response:
+        """Stream an image page as {"success": true, "data": {"images": [...], **meta}}, one row at a time."""
+        return self._json_stream('images', images, lambda count: meta)
+
+    def _json_stream(self, list_key: str, items, meta) -> Response:
+        """Stream {"data": {list_key: [...], **meta(count)}, "success": true} one item at a time.
+
+        `items` may be any iterable, including a generator still producing
+        results; `meta` is called with the item count once it is exhausted.
+        "success" comes last so that an error raised mid-stream can still be
+        reported as {"data": {list_key: [partial...]}, "success": false, "error": ...}.
+        Compressed with zstd, brotli or gzip when the client accepts it.
+        """
+        def generate():
+            yield b'{"data":{' + _dumps(list_key) + b':['
+            count = 0
+            try:
+                for item in items:
+                    if count:
+                        yield b','
+                    yield _dumps(item)
+                    count += 1
+            except Exception as e:
+                logger.error(f"[API] Streamed response error: {e}")
+                yield b']},"success":false,"error":' + _dumps(str(e) or type(e).__name__) + b'}'
+                return
+            fields = _dumps(meta(count))[1:]  # Closing brace included
+            yield (b']' if fields == b'}' else b'],') + fields + b',"success":true}'
+
+        body = generate()
+        encoding, compress, finish = _stream_compressor(request.accept_encodings)
+        if encoding:
+            def compressed(chunks):
+                for chunk in chunks:
+                    out = compress(chunk)
+                    if out:
+                        yield out
+                yield finish()
+            body = compressed(body)
+
+        response = Response(stream_with_context(body), mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _iter_on_loop(self, agen, timeout: float):
+        """Run an async generator on the ImageManager loop and iterate it from this thread.
+
+        Returns None if it could not be scheduled. An exception raised by the
+        generator is re-raised by the iterator, and TimeoutError is raised once
+        `timeout` seconds have passed in total.
+        """
+        items = queue.SimpleQueue()
+        done = object()
+        failure = []  # Exception raised by the generator, if any
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put(item)
+            except Exception as e:
+                failure.append(e)
+            finally:
+                items.put(done)
+
+        future = self.image_manager.schedule(pump())
+        if future is None:
+            return None
+
+        def iterate():
+            deadline = time.monotonic() + timeout
+            try:
+                while True:
+                    try:
+                        item = items.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        logger.error(f"[API] Streamed results timed out after {timeout}s")
+                        raise TimeoutError(f"Timed out after {timeout}s")
+                    if item is done:
+                        if failure:
+                            raise failure[0]
+                        return
+                    yield item
+            finally:
+                future.cancel()
+
+        return iterate()
 
     def _format_uptime(self, seconds: float) -> str:
         """Format uptime as HH:MM:SS."""
@@ -1209,7 +1324,6 @@ class APIServer:
 
     def _load_vision_settings(self) -> dict:
         """Load vision settings from config file."""
-        from core import system_monitor
 
         defaults = {
             "vision_auto_load": True,
@@ -1225,7 +1339,7 @@ class APIServer:
         }
 
         try:
-            settings_file = Path(__file__).parent.parent / "config" / "settings.json"
+            settings_file = PROJECT_ROOT / "config" / "settings.json"
             if settings_file.exists():
                 with open(settings_file, "r") as f:
                     saved = json.load(f)
@@ -1255,8 +1369,6 @@ class APIServer:
         Returns:
             dict with 'success', 'loaded', 'is_cpu', 'message'
         """
-        from core import system_monitor
-        from core.vision_manager import VisionManager
 
         try:
             settings = self._load_vision_settings()
@@ -1279,7 +1391,12 @@ class APIServer:
                 gpu_enabled = {str(device): True}
                 gpu_instances = {str(device): max_per_gpu}
 
-            gpu_count = system_monitor.get_gpu_count()
+            # Probe each GPU once up front; not cached across calls since free VRAM changes as we load
+            if strategy == "cpu_only":
+                gpu_stats = []
+            else:
+                gpu_stats = [system_monitor.get_gpu_stats(i) for i in range(system_monitor.get_gpu_count())]
+            gpu_count = len(gpu_stats)
             load_plan = []
             is_cpu_only = False
 
@@ -1291,7 +1408,7 @@ class APIServer:
             elif strategy == "specific":
                 for i in range(gpu_count):
                     if gpu_enabled.get(str(i), True):
-                        stats = system_monitor.get_gpu_stats(i)
+                        stats = gpu_stats[i]
                         if stats:
                             count = min(gpu_instances.get(str(i), 2), max_per_gpu)
                             load_plan.append((i, count, stats["name"]))
@@ -1303,7 +1420,7 @@ class APIServer:
 
             elif strategy == "all_gpus":
                 for i in range(gpu_count):
-                    stats = system_monitor.get_gpu_stats(i)
+                    stats = gpu_stats[i]
                     if stats:
                         available_vram = stats["vram_total_gb"] - stats["vram_used_gb"]
                         if available_vram >= 2.5:
@@ -1322,7 +1439,7 @@ class APIServer:
                 best_name = ""
 
                 for i in range(gpu_count):
-                    stats = system_monitor.get_gpu_stats(i)
+                    stats = gpu_stats[i]
                     if stats:
                         available_vram = stats["vram_total_gb"] - stats["vram_used_gb"]
                         if available_vram > best_vram:
@@ -1343,7 +1460,7 @@ class APIServer:
                 usable_gpus = []
 
                 for i in range(gpu_count):
-                    stats = system_monitor.get_gpu_stats(i)
+                    stats = gpu_stats[i]
                     if stats:
                         available_vram = stats["vram_total_gb"] - stats["vram_used_gb"]
                         if available_vram >= 2.5:
@@ -1376,30 +1493,28 @@ class APIServer:
                     'message': 'No GPU or CPU available for loading'
                 }
 
-            # Load instances according to plan
+            # Load instances according to plan; each load releases the semaphore once
             loaded = 0
-            load_events = []
+            started = 0
+            loaded_sem = threading.Semaphore(0)
 
             for device_spec, count, name in load_plan:
                 for _ in range(count):
                     manager = VisionManager(root=None)
-                    event = threading.Event()
-
-                    def on_loaded(e=event):
-                        e.set()
-
-                    manager.on_loaded_callback = on_loaded
+                    manager.on_loaded_callback = loaded_sem.release
                     manager.load(device_spec)
 
-                    with self.vision_lock:
-                        self.vision_registry.add(manager)
+                    self.vision_registry.add(manager)
 
-                    load_events.append(event)
+                    started += 1
 
-            # Wait for all instances to load (with timeout)
-            for event in load_events:
-                if event.wait(timeout=60):
-                    loaded += 1
+            # Wait for all instances to load, 60s in total
+            deadline = time.monotonic() + 60
+            for _ in range(started):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not loaded_sem.acquire(timeout=remaining):
+                    break
+                loaded += 1
 
             if loaded > 0:
                 if is_cpu_only:
@@ -1436,187 +1551,263 @@ class APIServer:
     def _unload_all_vision(self):
         """Unload all vision instances and free memory."""
         try:
-            with self.vision_lock:
-                self.vision_registry.unload_all()
+            self.vision_registry.unload_all()
             logger.info("[API] All vision instances unloaded")
             return True
         except Exception as e:
             logger.error(f"[API] Failed to unload vision: {e}")
             return False
 
-    def _task_worker(self):
-        """Process async tasks from the queue."""
-        import aiohttp
+    def _submit_task(self, task: dict):
+        """Queue a task for its type's worker on the ImageManager loop."""
+        future = self.image_manager.schedule(self._enqueue_task(task))
+        if future is None:
+            self._update_task(task['task_id'], status='failed', error='Failed to schedule task')
+
+    async def _enqueue_task(self, task: dict):
+        loop = asyncio.get_running_loop()
+        if self._task_loop is not loop:
+            # First task, or the ImageManager loop was restarted
+            self._task_loop = loop
+            self._task_queues = {}
+            self._task_workers = []
 
-        while self.worker_running:
+        task_type = task.get('type')
+        tasks = self._task_queues.get(task_type)
+        if tasks is None:
+            tasks = self._task_queues[task_type] = asyncio.Queue()
+            self._task_workers.append(loop.create_task(self._task_worker(tasks)))
+        tasks.put_nowait(task)
+
+    async def _task_worker(self, tasks: asyncio.Queue):
+        """Run one task type's tasks in order.
+
+        Pure network tasks run on the loop itself; the rest block on vision
+        results, so they run in the loop's default executor. Task types get
+        separate workers, so a long vision task never holds up a
+        search/download task queued behind it.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            task = await tasks.get()
+            handler = self._task_handlers.get(task.get('type'))
             try:
-                task = self.task_queue.get(timeout=1.0)
-                if task is None:
-                    break
-                self._process_task(task)
-            except queue.Empty:
-                continue
+                if handler is None:
+                    logger.error(f"[API] Unknown task type: {task.get('type')}")
+                    self._update_task(task.get('task_id'), status='failed', error='Unknown task type')
+                elif inspect.iscoroutinefunction(handler):
+                    await handler(task)
+                else:
+                    await loop.run_in_executor(None, self._process_task, handler, task)
             except Exception as e:
                 logger.error(f"[API] Task worker error: {e}")
 
-    def _process_task(self, task: dict):
-        """Process a single async task."""
-        task_type = task.get('type')
-        task_id = task.get('task_id')
+    async def _stop_task_workers(self):
+        for worker in self._task_workers:
+            worker.cancel()
+        self._task_workers = []
+        self._task_queues = {}
+        self._task_loop = None
 
+    def _process_task(self, handler, task: dict):
+        """Run a blocking task handler, failing the task if it raises."""
         try:
-            if task_type == 'download_batch':
-                self._process_download_batch(task)
-            elif task_type == 'vision_analyze':
-                self._process_vision_analyze(task)
-            elif task_type == 'search_download':
-                self._process_search_download(task)
-            elif task_type == 'smart_analyze':
-                self._process_smart_analyze(task)
-            elif task_type == 'search_download_analyze':
-                self._process_search_download_analyze(task)
-            else:
-                logger.error(f"[API] Unknown task type: {task_type}")
-                self._update_task(task_id, status='failed', error='Unknown task type')
+            handler(task)
         except Exception as e:
             logger.error(f"[API] Task processing error: {e}")
-            self._update_task(task_id, status='failed', error=str(e))
-
-    def _process_download_batch(self, task: dict):
-        """Process batch download task."""
-        import aiohttp
-
-        task_id = task['task_id']
-        items = task['items']
-        preview_only = task.get('preview_only', False)
-
-        async def do_downloads():
-            completed = 0
-            errors = []
-
-            async with aiohttp.ClientSession() as session:
-                for item in items:
-                    try:
-                        url = item.get('url', '')
-                        if not url:
-                            continue
-
-                        result = await self.image_manager.download_and_save(
-                            session,
-                            url,
-                            item.get('tags', []),
-                            item.get('source', 'API'),
-                            item.get('query', 'batch'),
-                            item.get('alt', ''),
-                            preview_only
-                        )
+            self._update_task(task.get('task_id'), status='failed', error=str(e))
+
+    def _schedule_task(self, task_id: str, coro):
+        """Run a task coroutine on the ImageManager loop, failing the task if it can't be scheduled."""
+        future = self.image_manager.schedule(coro)
+        if future is None:
+            coro.close()
+            self._update_task(task_id, status='failed', error='Failed to schedule task')
+        return future
+
+    async def _run_download_batch(self, task_id: str, items: list, preview_only: bool = False):
+        """Download a batch concurrently over one shared session."""
+        completed = 0
+        errors = []
+        sem = asyncio.Semaphore(BATCH_DOWNLOAD_CONCURRENCY)
 
-                        if result:
-                            completed += 1
-                        else:
-                            errors.append(f"Failed: {url}")
+        async def download(session, item):
+            nonlocal completed
+            url = item.get('url', '')
+            if not url:
+                return
+            try:
+                async with sem:
+                    result = await self.image_manager.download_and_save(
+                        session,
+                        url,
+                        item.get('tags', []),
+                        item.get('source', 'API'),
+                        item.get('query', 'batch'),
+                        item.get('alt', ''),
+                        preview_only
+                    )
+
+                if result:
+                    completed += 1
+                else:
+                    errors.append(f"Failed: {url}")
+            except Exception as e:
+                errors.append(f"{url}: {str(e)}")
 
-                        self._update_task(task_id, completed=completed, errors=errors)
+            self._update_task(task_id, completed=completed, errors=errors)
 
-                    except Exception as e:
-                        errors.append(f"{url}: {str(e)}")
+        try:
+            session = await self.image_manager.get_session()
+            await asyncio.gather(*(download(session, item) for item in _unique_by_url(items)))
+            self._update_task(task_id, status='completed', completed=completed, errors=errors)
+        except Exception as e:
+            logger.error(f"[API] Batch download task error: {e}")
+            self._update_task(task_id, status='failed', error=str(e))
 
-            return completed, errors
+    async def _download_search_results(self, task_id: str, results: list, query: str,
+                                       preview_only: bool = False) -> tuple[list, list]:
+        """Download search results concurrently, updating task progress as each finishes."""
+        errors = []
+        downloaded = [img async for img in self._iter_search_downloads(task_id, results, query, preview_only, errors)]
+        return downloaded, errors
 
-        future = self.image_manager.schedule(do_downloads())
-        if future:
-            completed, errors = future.result(timeout=600)
-            self._update_task(task_id, status='completed', completed=completed, errors=errors)
-        else:
-            self._update_task(task_id, status='failed', error='Failed to schedule downloads')
+    async def _iter_search_downloads(self, task_id: str, results: list, query: str,
+                                     preview_only: bool, errors: list):
+        """Download search results concurrently, yielding each saved image as it lands.
 
-    def _process_vision_analyze(self, task: dict):
-        """Process batch vision analysis task."""
-        task_id = task['task_id']
-        image_ids = task['image_ids']
-        need_objects = task.get('need_objects', True)
+        Failures are appended to `errors`; task progress is updated per download.
+        """
+        session = await self.image_manager.get_session()
+        sem = asyncio.Semaphore(BATCH_DOWNLOAD_CONCURRENCY)
+
+        async def download(item):
+            async with sem:
+                return await self.image_manager.download_and_save(
+                    session,
+                    item['url'],
+                    item.get('tags', []),
+                    item.get('source', 'Search'),
+                    query,
+                    item.get('alt', ''),
+                    preview_only
+                )
+
+        saved = 0
+        for next_done in asyncio.as_completed([download(item) for item in _unique_by_url(results)]):
+            try:
+                result = await next_done
+            except Exception as e:
+                errors.append(str(e))
+                result = None
 
-        completed = 0
-        errors = []
+            if result:
+                saved += 1
+            self._update_task(task_id, completed=saved)
+            if result:
+                yield result
 
-        with self.vision_lock:
-            instances = [m for m in self.vision_registry.instances if m.is_loaded()]
+    async def _run_vision_analyze(self, task_id: str, image_ids: list, need_objects: bool = True):
+        """Analyze a batch of images, one consumer per loaded vision instance."""
+        instances = self.vision_registry.get_loaded()
 
         if not instances:
             self._update_task(task_id, status='failed', error='No vision instances')
             return
 
-        images = self.image_manager.get_all_images()
-        images_map = {img['id']: img for img in images}
-
-        for idx, image_id in enumerate(image_ids):
-            try:
-                image = images_map.get(image_id)
-                if not image:
-                    errors.append(f"Image not found: {image_id}")
-                    continue
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue()
+        for image_id in image_ids:
+            pending.put_nowait(image_id)
 
+        def resolve():
+            # All rows in one query and one file scan, off the download loop
+            images_map = {img['id']: img for img in self.image_manager.get_images_by_ids(image_ids)}
+            files = {}
+            for image_id, image in images_map.items():
                 path = image.get('path') or image.get('thumb_path')
-                if not path:
-                    errors.append(f"No file: {image_id}")
-                    continue
+                if path:
+                    files[image_id] = os.path.join(self._root, path)
+            return images_map, files, _existing_paths(list(files.values()))
 
-                full_path = Path(path)
-                if not full_path.is_absolute():
-                    full_path = Path(__file__).parent.parent / path
+        images_map, files, existing = await loop.run_in_executor(None, resolve)
 
-                if not full_path.exists():
-                    errors.append(f"File missing: {image_id}")
-                    continue
+        completed = 0
+        errors = []
+        pending_rows = []  # (alt, tags_json, id) written every ANALYSIS_COMMIT_BATCH images
 
-                # Round-robin instance selection
-                manager = instances[idx % len(instances)]
+        async def flush(rows):
+            # The write waits on ImageManager's write lock, so it runs off the loop too
+            try:
+                await loop.run_in_executor(None, self.image_manager.apply_analysis_batch, rows)
+            except Exception as e:
+                errors.append(f"DB update failed for {len(rows)} images: {e}")
 
-                result_event = threading.Event()
-                analysis_data = {}
+        async def analyze(image_id, manager):
+            nonlocal completed, pending_rows
+            image = images_map.get(image_id)
+            if not image:
+                errors.append(f"Image not found: {image_id}")
+                return
 
-                def callback(data):
-                    analysis_data.update(data)
-                    result_event.set()
+            full_path = files.get(image_id)
+            if not full_path:
+                errors.append(f"No file: {image_id}")
+                return
 
-                manager.send_analysis(str(full_path), callback, need_objects, direct_callback=True)
+            if full_path not in existing:
+                errors.append(f"File missing: {image_id}")
+                return
 
-                if result_event.wait(timeout=60):
-                    if 'error' in analysis_data:
-                        errors.append(f"{image_id}: {analysis_data['error']}")
-                    else:
-                        analysis = analysis_data.get('analysis', {})
+            # Resolved from the vision reader thread
+            result = loop.create_future()
 
-                        # Apply to DB
-                        if analysis:
-                            updates = ['vision_processed = 1']
-                            values = []
-                            if analysis.get('caption'):
-                                updates.append('alt = ?')
-                                values.append(analysis['caption'])
-                            if analysis.get('objects'):
-                                updates.append('tags = ?')
-                                values.append(json.dumps(analysis['objects']))
-                            values.append(image_id)
-                            sql = f"UPDATE images SET {', '.join(updates)} WHERE id = ?"
-                            with self.image_manager.conn:
-                                self.image_manager.conn.execute(sql, values)
+            def callback(data):
+                loop.call_soon_threadsafe(lambda: result.done() or result.set_result(data))
 
-                        completed += 1
-                else:
-                    errors.append(f"Timeout: {image_id}")
+            manager.send_analysis(full_path, callback, need_objects, direct_callback=True)
 
-                self._update_task(task_id, completed=completed, errors=errors)
+            try:
+                analysis_data = await asyncio.wait_for(result, timeout=60)
+            except asyncio.TimeoutError:
+                errors.append(f"Timeout: {image_id}")
+                return
 
-            except Exception as e:
-                errors.append(f"{image_id}: {str(e)}")
+            if 'error' in analysis_data:
+                errors.append(f"{image_id}: {analysis_data['error']}")
+                return
 
-        self._update_task(task_id, status='completed', completed=completed, errors=errors)
+            analysis = analysis_data.get('analysis', {})
+
+            # Apply to DB, one transaction per ANALYSIS_COMMIT_BATCH images
+            if analysis:
+                pending_rows.append((
+                    analysis.get('caption') or None,
+                    _dumps(analysis['objects']).decode() if analysis.get('objects') else None,
+                    image_id
+                ))
+                if len(pending_rows) >= ANALYSIS_COMMIT_BATCH:
+                    rows, pending_rows = pending_rows, []
+                    await flush(rows)
+
+            completed += 1
+
+        async def consume(manager):
+            while not pending.empty():
+                image_id = pending.get_nowait()
+                try:
+                    await analyze(image_id, manager)
+                except Exception as e:
+                    errors.append(f"{image_id}: {str(e)}")
+                self._update_task(task_id, completed=completed, errors=errors)
 
-    def _process_search_download(self, task: dict):
-        """Process search and download task."""
-        import aiohttp
+        await asyncio.gather(*(consume(manager) for manager in instances))
+        if pending_rows:
+            await flush(pending_rows)
+        self._update_task(task_id, status='completed', completed=completed, errors=errors)
 
+    async def _process_search_download(self, task: dict):
+        """Process search and download task (runs on the ImageManager loop)."""
         task_id = task['task_id']
         query = task['query']
         sources = task['sources']
@@ -1630,38 +1821,14 @@ class APIServer:
 
             self._update_task(task_id, total=len(results))
 
-            completed = 0
-            errors = []
-
-            async with aiohttp.ClientSession() as session:
-                for item in results:
-                    try:
-                        result = await self.image_manager.download_and_save(
-                            session,
-                            item['url'],
-                            item.get('tags', []),
-                            item.get('source', 'Search'),
-                            query,
-                            item.get('alt', ''),
-                            preview_only
-                        )
-
-                        if result:
-                            completed += 1
+            return await self._download_search_results(task_id, results, query, preview_only)
 
-                        self._update_task(task_id, completed=completed)
-
-                    except Exception as e:
-                        errors.append(str(e))
-
-            return completed, errors
-
-        future = self.image_manager.schedule(do_search_download())
-        if future:
-            completed, errors = future.result(timeout=600)
-            self._update_task(task_id, status='completed', completed=completed, errors=errors)
-        else:
-            self._update_task(task_id, status='failed', error='Failed to schedule')
+        try:
+            downloaded, errors = await asyncio.wait_for(do_search_download(), timeout=600)
+            self._update_task(task_id, status='completed', completed=len(downloaded), errors=errors)
+        except Exception as e:
+            logger.error(f"[API] Task processing error: {e}")
+            self._update_task(task_id, status='failed', error=str(e) or type(e).__name__)
 
     def _process_smart_analyze(self, task: dict):
         """Process smart analyze task: analyze images with auto-unload."""
@@ -1673,10 +1840,9 @@ class APIServer:
 
         completed = 0
         errors = []
-        project_root = Path(__file__).parent.parent
+        pending_rows = []  # (alt, tags_json, id) written every ANALYSIS_COMMIT_BATCH images
 
-        with self.vision_lock:
-            instances = [m for m in self.vision_registry.instances if m.is_loaded()]
+        instances = self.vision_registry.get_loaded()
 
         if not instances:
             self._update_task(task_id, status='failed', error='No vision instances available')
@@ -1685,68 +1851,54 @@ class APIServer:
         # Check if CPU mode (for throttling)
         is_cpu = all(getattr(m, 'device', 'cpu') == 'cpu' for m in instances)
 
-        for idx, img in enumerate(images):
-            try:
-                path = img.get('path') or img.get('thumb_path')
-                if not path:
-                    errors.append(f"No file for {img['id']}")
-                    continue
-
-                full_path = Path(path)
-                if not full_path.is_absolute():
-                    full_path = project_root / path
-
-                if not full_path.exists():
-                    errors.append(f"File missing: {img['id']}")
-                    continue
-
-                # Round-robin instance selection
-                manager = instances[idx % len(instances)]
-
-                result_event = threading.Event()
-                analysis_data = {}
+        to_analyze = []
+        for img in images:
+            path = img.get('path') or img.get('thumb_path')
+            if not path:
+                errors.append(f"No file for {img['id']}")
+                continue
+            to_analyze.append((img, os.path.join(self._root, path)))
 
-                def callback(data):
-                    analysis_data.update(data)
-                    result_event.set()
+        existing = _existing_paths([full_path for _, full_path in to_analyze])
+        for img, full_path in to_analyze:
+            if full_path not in existing:
+                errors.append(f"File missing: {img['id']}")
+        to_analyze = [(img, full_path) for img, full_path in to_analyze if full_path in existing]
 
-                manager.send_analysis(str(full_path), callback, apply_tags, direct_callback=True)
+        # Existing tags for the merge, fetched in one query instead of one per image
+        stored_tags = self.image_manager.get_tags_by_ids([img['id'] for img, _ in to_analyze]) if apply_tags else {}
 
-                if result_event.wait(timeout=60):
+        for img, analysis_data in self._analyze_in_batches(to_analyze, apply_tags, len(instances), is_cpu):
+            try:
+                if analysis_data is not None:
                     if 'error' in analysis_data:
                         errors.append(f"{img['id']}: {analysis_data['error']}")
                     else:
                         analysis = analysis_data.get('analysis', {})
 
                         if analysis:
-                            updates = ['vision_processed = 1']
-                            values = []
+                            alt = tags_json = None
 
                             if apply_captions and analysis.get('caption'):
-                                updates.append('alt = ?')
-                                values.append(analysis['caption'])
+                                alt = analysis['caption']
 
                             if apply_tags and analysis.get('objects'):
                                 # Merge with existing tags
-                                cur = self.image_manager.conn.execute(
-                                    "SELECT tags FROM images WHERE id = ?", (img['id'],)
-                                )
-                                row = cur.fetchone()
                                 existing = []
-                                if row and row[0]:
+                                if stored := stored_tags.get(img['id']):
                                     try:
-                                        existing = [t.lower() for t in json.loads(row[0])]
+                                        existing = [t.lower() for t in _loads(stored)]
                                     except:
                                         pass
                                 new_tags = analysis['objects']
-                                merged = new_tags + [t for t in existing if t.lower() not in [n.lower() for n in new_tags]]
-                                updates.append('tags = ?')
-                                values.append(json.dumps(merged))
+                                new_lower = {n.lower() for n in new_tags}
+                                merged = new_tags + [t for t in existing if t not in new_lower]
+                                tags_json = _dumps(merged).decode()
 
-                            values.append(img['id'])
-                            sql = f"UPDATE images SET {', '.join(updates)} WHERE id = ?"
-                            with self.image_manager.conn:
-                                self.image_manager.conn.execute(sql, values)
+                            pending_rows.append((alt, tags_json, img['id']))
+                            if len(pending_rows) >= ANALYSIS_COMMIT_BATCH:
+                                self.image_manager.apply_analysis_batch(pending_rows)
+                                pending_rows = []
 
                         completed += 1
                 else:
@@ -1754,13 +1906,14 @@ class APIServer:
 
                 self._update_task(task_id, completed=completed, errors=errors)
 
-                # CPU throttle
-                if is_cpu and (idx + 1) % 3 == 0:
-                    time.sleep(0.5)
-
             except Exception as e:
                 errors.append(f"{img['id']}: {str(e)}")
 
+        try:
+            self.image_manager.apply_analysis_batch(pending_rows)
+        except Exception as e:
+            errors.append(f"DB update failed: {e}")
+
         # Auto-unload if requested
         if auto_unload:
             logger.info("[API] Smart analyze: auto-unloading vision instances")
@@ -1769,10 +1922,42 @@ class APIServer:
         self._update_task(task_id, status='completed', completed=completed, errors=errors,
                           result={'auto_unloaded': auto_unload})
 
+    @staticmethod
+    def _cpu_backoff():
+        """Pause briefly if the machine is saturated; used between CPU-mode analysis windows."""
+        if system_monitor.get_cpu_percent() >= CPU_THROTTLE_PERCENT:
+            time.sleep(0.2)
+
+    def _analyze_in_batches(self, items: list, need_objects: bool, instance_count: int,
+                            throttle: bool = False):
+        """Analyze (item, image_path) pairs through the batch scheduler.
+
+        Requests go out a window at a time, sized so each loaded instance gets
+        one full batch per window. Yields (item, result) in input order; the
+        result is None on timeout. With `throttle` (CPU mode), a window waits
+        briefly first if the machine is saturated, instead of pausing every time.
+        """
+        window = self.batch_scheduler.max_batch * max(1, instance_count)
+        if throttle:
+            system_monitor.get_cpu_percent()  # Prime the sampler; the next read covers the first window
+        for start in range(0, len(items), window):
+            if throttle and start:
+                self._cpu_backoff()
+
+            futures = [
+                (item, self.batch_scheduler.submit(image_path, need_objects))
+                for item, image_path in items[start:start + window]
+            ]
+            # Each instance works through a whole batch, so the window shares one deadline
+            deadline = time.monotonic() + ANALYSIS_TIMEOUT * self.batch_scheduler.max_batch
+            for item, future in futures:
+                try:
+                    yield item, future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    yield item, None
+
     def _process_search_download_analyze(self, task: dict):
         """Process full pipeline: search, download, analyze, unload."""
-        import aiohttp
-
         task_id = task['task_id']
         query = task['query']
         sources = task['sources']
@@ -1780,129 +1965,113 @@ class APIServer:
         preview_only = task.get('preview_only', False)
         auto_unload = task.get('auto_unload', True)
 
-        # Phase 1: Search and download
-        async def do_search_download():
+        # Phase 1: Search, then download; saved images stream back as each one lands
+        download_errors = []
+
+        async def iter_downloads():
             results = await self.image_manager.search_all(query, sources)
             results = results[:limit]
 
             self._update_task(task_id, total=len(results), result={'phase': 'downloading'})
 
-            downloaded = []
-            errors = []
-
-            async with aiohttp.ClientSession() as session:
-                for item in results:
-                    try:
-                        result = await self.image_manager.download_and_save(
-                            session,
-                            item['url'],
-                            item.get('tags', []),
-                            item.get('source', 'Search'),
-                            query,
-                            item.get('alt', ''),
-                            preview_only
-                        )
-
-                        if result:
-                            downloaded.append(result)
+            async for img in self._iter_search_downloads(task_id, results, query, preview_only, download_errors):
+                yield img
 
-                        self._update_task(task_id, completed=len(downloaded))
-
-                    except Exception as e:
-                        errors.append(str(e))
-
-            return downloaded, errors
-
-        future = self.image_manager.schedule(do_search_download())
-        if not future:
+        streamed = self._iter_on_loop(iter_downloads(), timeout=600)
+        if streamed is None:
             self._update_task(task_id, status='failed', error='Failed to schedule downloads')
             return
 
-        downloaded, download_errors = future.result(timeout=600)
+        def collect(items):
+            # A failed or timed-out search/download stream ends the downloads; keep what arrived
+            try:
+                yield from items
+            except Exception as e:
+                download_errors.append(str(e) or type(e).__name__)
 
-        if not downloaded:
+        downloads = collect(streamed)
+
+        # Vision is only loaded once there is something to analyze
+        first = next(downloads, None)
+        if first is None:
             self._update_task(task_id, status='completed', completed=0,
                               errors=download_errors, result={'downloaded': 0, 'analyzed': 0})
             return
+        downloaded = [first]
 
-        # Phase 2: Auto-load vision if needed
+        # Phase 2: Auto-load vision if needed, while the remaining downloads continue
         self._update_task(task_id, result={'phase': 'loading_vision'})
 
-        with self.vision_lock:
-            loaded = self.vision_registry.get_loaded_count()
+        loaded = self.vision_registry.get_loaded_count()
 
         if loaded == 0:
             load_result = self._auto_load_vision()
             if not load_result['success']:
+                downloaded.extend(downloads)
                 self._update_task(task_id, status='completed',
                                   result={'downloaded': len(downloaded), 'analyzed': 0,
                                           'error': 'Vision load failed: ' + load_result['message']})
                 return
 
-        # Phase 3: Analyze downloaded images
-        self._update_task(task_id, result={'phase': 'analyzing'})
-
-        with self.vision_lock:
-            instances = [m for m in self.vision_registry.instances if m.is_loaded()]
-
-        if not instances:
+        if not self.vision_registry.get_loaded_count():
+            downloaded.extend(downloads)
             self._update_task(task_id, status='completed',
                               result={'downloaded': len(downloaded), 'analyzed': 0,
                                       'error': 'No vision instances available'})
             return
 
-        project_root = Path(__file__).parent.parent
+        # Phase 3: Analyze each image as soon as it is downloaded
+        self._update_task(task_id, result={'phase': 'analyzing'})
+
         analyzed = 0
         analyze_errors = []
+        pending = []  # (image, analysis future)
 
-        for idx, img in enumerate(downloaded):
+        instances = self.vision_registry.get_loaded()
+        is_cpu = all(getattr(m, 'device', 'cpu') == 'cpu' for m in instances)
+        window = self.batch_scheduler.max_batch * max(1, len(instances))
+        if is_cpu:
+            system_monitor.get_cpu_percent()  # Prime the sampler; the next read covers the first window
+
+        def submit(img):
+            path = img.get('path') or img.get('thumb_path')
+            if path:
+                full_path = os.path.join(self._root, path)
+                if os.path.exists(full_path):
+                    # CPU mode backs off between windows, as in _analyze_in_batches
+                    if is_cpu and pending and len(pending) % window == 0:
+                        self._cpu_backoff()
+                    pending.append((img, self.batch_scheduler.submit(full_path, True)))
+
+        submit(first)
+        for img in downloads:
+            downloaded.append(img)
+            submit(img)
+
+        # One deadline for the whole run: each instance's share of the images at ANALYSIS_TIMEOUT apiece
+        deadline = time.monotonic() + ANALYSIS_TIMEOUT * math.ceil(len(pending) / max(1, len(instances)))
+        rows = []
+        for img, future in pending:
             try:
-                path = img.get('path') or img.get('thumb_path')
-                if not path:
-                    continue
-
-                full_path = Path(path)
-                if not full_path.is_absolute():
-                    full_path = project_root / path
-
-                if not full_path.exists():
-                    continue
-
-                manager = instances[idx % len(instances)]
-
-                result_event = threading.Event()
-                analysis_data = {}
-
-                def callback(data):
-                    analysis_data.update(data)
-                    result_event.set()
-
-                manager.send_analysis(str(full_path), callback, True, direct_callback=True)
-
-                if result_event.wait(timeout=60):
-                    if 'analysis' in analysis_data:
-                        analysis = analysis_data['analysis']
-
-                        updates = ['vision_processed = 1']
-                        values = []
-
-                        if analysis.get('caption'):
-                            updates.append('alt = ?')
-                            values.append(analysis['caption'])
-
-                        if analysis.get('objects'):
-                            updates.append('tags = ?')
-                            values.append(json.dumps(analysis['objects']))
-
-                        values.append(img['id'])
-                        sql = f"UPDATE images SET {', '.join(updates)} WHERE id = ?"
-                        with self.image_manager.conn:
-                            self.image_manager.conn.execute(sql, values)
-
-                        analyzed += 1
+                analysis_data = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                analyze_errors.append(f"Timeout: {img['id']}")
+                continue
+            if 'error' in analysis_data:
+                analyze_errors.append(f"{img['id']}: {analysis_data['error']}")
+            elif 'analysis' in analysis_data:
+                analysis = analysis_data['analysis']
+                rows.append((
+                    analysis.get('caption') or None,
+                    _dumps(analysis['objects']).decode() if analysis.get('objects') else None,
+                    img['id']
+                ))
+                analyzed += 1
 
-            except Exception as e:
-                analyze_errors.append(str(e))
+        try:
+            self.image_manager.apply_analysis_batch(rows)
+        except Exception as e:
+            analyze_errors.append(str(e))
 
         # Phase 4: Auto-unload if requested
         if auto_unload:
@@ -1922,6 +2091,8 @@ class APIServer:
 
         try:
             self.start_time = time.time()
+            # One daemon thread per request: endpoints blocking on vision/download
+            # futures never stall other requests
             self.server = make_server(self.host, self.port, self.app, threaded=True)
 
             # Start server thread
@@ -1932,14 +2103,8 @@ class APIServer:
             )
             self.server_thread.start()
 
-            # Start background worker
-            self.worker_running = True
-            self.worker_thread = threading.Thread(
-                target=self._task_worker,
-                daemon=True,
-                name="APITaskWorker"
-            )
-            self.worker_thread.start()
+            # Start vision batching
+            self.batch_scheduler.start()
 
             self.running = True
             logger.info(f"[API] Server started on http://{self.host}:{self.port}")
@@ -1956,10 +2121,11 @@ class APIServer:
 
         logger.info("[API] Stopping server...")
         self.running = False
-        self.worker_running = False
 
-        # Signal worker to stop
-        self.task_queue.put(None)
+        # Stop task workers (only if the image manager was ever created)
+        if self._task_workers and self._image_manager is not None:
+            self._image_manager.schedule(self._stop_task_workers())
+        self.batch_scheduler.stop()
 
         # Shutdown server
         if self.server:
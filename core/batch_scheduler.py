@@ -0,0 +1,202 @@
+# core/batch_scheduler.py
+# Micro-batching of vision analysis requests for the API server
+
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from core import logger
+
+
+class BatchScheduler:
+    """Coalesce concurrent analysis requests into batched vision worker calls.
+
+    Requests are collected until `max_batch` are waiting or `max_wait_ms` has
+    passed since the first one, then sent as a single batch to whichever loaded
+    instance is idle. Each request gets a Future resolved with the worker's
+    result dict ({"analysis": ...} or {"error": ...}).
+    """
+
+    def __init__(self, vision_registry, max_batch: int = 8, max_wait_ms: int = 20,
+                 instance_wait: float = 60.0):
+        self.vision_registry = vision_registry
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self.instance_wait = instance_wait
+
+        self.requests = queue.Queue()
+        self.running = False
+        self.thread = None
+
+        # Idle (manager, generation) entries; a busy one is put back when its batch finishes.
+        # Entries from before a manager's reload are stale and dropped when taken.
+        self._idle = queue.SimpleQueue()
+        self._known = {}  # Manager -> load generation handed to _idle (idle or busy); scheduler thread only
+
+    def start(self):
+        """Start the batching thread."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name="VisionBatcher")
+        self.thread.start()
+
+    def stop(self):
+        """Stop the batching thread; requests still queued fail with an error."""
+        if not self.running:
+            return
+        self.running = False
+        self.requests.put(None)
+
+    def submit(self, image_path: str, need_objects: bool = True) -> Future:
+        """Queue an image for analysis and return a Future for its result."""
+        future = Future()
+        if not self.running:
+            future.set_result({"error": "Batch scheduler not running"})
+            return future
+
+        self.requests.put((image_path, need_objects, future))
+        return future
+
+    def _run(self):
+        """Collect requests into batches and dispatch them."""
+        while self.running:
+            item = self.requests.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.running = False
+                    break
+                batch.append(item)
+
+            try:
+                batch = self._answer_cached(batch)
+                if batch:
+                    self._dispatch(batch)
+            except Exception as e:
+                logger.error(f"[BatchScheduler] Dispatch error: {e}")
+                self._fail(batch, str(e))
+
+        # Drain anything left behind after stop
+        leftover = []
+        while True:
+            try:
+                item = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                leftover.append(item)
+        self._fail(leftover, "Batch scheduler stopped")
+
+    def _answer_cached(self, batch: list) -> list:
+        """Resolve repeated images from the registry's result cache; returns the misses.
+
+        Hashing happens here on the scheduler thread, not in the submitting request.
+        """
+        misses = []
+        for image_path, need_objects, future in batch:
+            try:
+                key = self.vision_registry.image_key(image_path)
+            except OSError:
+                key = None
+            if key is not None:
+                cached = self.vision_registry.get_cached_analysis(key, need_objects)
+                if cached is not None:
+                    future.set_result({"analysis": cached})
+                    continue
+                future.add_done_callback(
+                    lambda f, key=key, need_objects=need_objects:
+                        self.vision_registry.cache_analysis(key, need_objects, f.result())
+                )
+            misses.append((image_path, need_objects, future))
+        return misses
+
+    def _dispatch(self, batch: list):
+        """Send a batch to idle instances, one worker call per need_objects flag."""
+        groups = {}
+        for image_path, need_objects, future in batch:
+            groups.setdefault(need_objects, []).append((image_path, future))
+
+        for need_objects, group in groups.items():
+            acquired = self._acquire_instance()
+            if acquired is None:
+                self._fail([(None, None, future) for _, future in group], "No vision instances available")
+                continue
+
+            manager, generation = acquired
+            release = self._release_after(manager, generation, len(group))
+            manager.send_analysis_batch(
+                [image_path for image_path, _ in group],
+                [functools.partial(self._complete, future, release) for _, future in group],
+                need_objects,
+                direct_callback=True
+            )
+
+    def _sync_instances(self):
+        """Track newly loaded (or reloaded) instances as idle and forget unloaded ones."""
+        loaded = self.vision_registry.get_loaded()
+        for manager in loaded:
+            if self._known.get(manager) != manager.generation:
+                self._known[manager] = manager.generation
+                self._idle.put((manager, manager.generation))
+        for manager in set(self._known).difference(loaded):
+            del self._known[manager]
+
+    def _acquire_instance(self):
+        """Wait for an idle loaded instance as (manager, generation); None if none frees up within instance_wait."""
+        deadline = time.monotonic() + self.instance_wait
+        while self.running:
+            self._sync_instances()
+            if not self._known:
+                return None
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                manager, generation = self._idle.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+
+            if self._known.get(manager) == generation == manager.generation and manager.is_loaded():
+                return manager, generation
+        return None
+
+    def _release_after(self, manager, generation: int, count: int):
+        """Return a callable that puts `manager` back on the idle queue after `count` calls."""
+        lock = threading.Lock()
+        remaining = [count]
+
+        def release():
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] != 0:
+                    return
+            self._idle.put((manager, generation))
+
+        return release
+
+    @staticmethod
+    def _complete(future: Future, release, data: dict):
+        if not future.done():
+            future.set_result(data)
+        release()
+
+    @staticmethod
+    def _fail(batch: list, message: str):
+        for _, _, future in batch:
+            if not future.done():
+                future.set_result({"error": message})
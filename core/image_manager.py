@@ -3,14 +3,35 @@ import os, warnings
 import io, hashlib
 import json
 import uuid
+import functools
+import operator
+import queue
 import threading
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import aiohttp
 from pathlib import Path
 from PIL import Image
 import sqlite3
 from config import PIXABAY_KEY, PEXELS_KEY, UNSPLASH_KEY
 from core import logger
+from core.url_filter import UrlFilter
+
+try:
+    import aiodns  # Backs aiohttp.AsyncResolver
+except ImportError:
+    aiodns = None
+
+try:
+    import uvloop  # libuv-backed event loop (not available on Windows)
+except ImportError:
+    uvloop = None
+
+try:
+    import pyvips  # Shrink-on-load thumbnailing; raises OSError when libvips itself is missing
+except (ImportError, OSError):
+    pyvips = None
 
 PROJECT_ROOT = Path(__file__).parent.parent
 IMAGES_DIR = PROJECT_ROOT / "images"
@@ -23,11 +44,111 @@ IMAGES_DIR.mkdir(exist_ok=True)
 ORIGINALS_DIR.mkdir(exist_ok=True)
 THUMBS_DIR.mkdir(exist_ok=True)
 
+# Image CDNs the sources serve downloads from; resolved and connected when the session opens
+CDN_HOSTS = ("cdn.pixabay.com", "images.pexels.com", "images.unsplash.com")
+DNS_CACHE_TTL = 3600
+
+# Connection tuning: WAL lets readers run during writes and commits skip the full fsync,
+# the rest keep hot pages and temp b-trees in memory and wait out brief write locks
+DB_PRAGMAS = (
+    "PRAGMA foreign_keys = OFF",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -40000",
+    "PRAGMA mmap_size = 536870912",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Read-only connections kept for queries, so reads run alongside the writer under WAL
+DB_READERS = 4
+
+# New image rows are committed together: a batch is flushed once this many are queued,
+# or this many seconds after the first one arrived
+INSERT_BATCH_SIZE = 100
+INSERT_FLUSH_DELAY = 0.1
+
+# Read size when streaming originals to disk
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Concurrent per-photo detail requests per Unsplash search page
+UNSPLASH_DETAIL_CONCURRENCY = 8
+
+# Longest side of generated thumbnails
+THUMB_SIZE = 300
+
+
+# Warning state shared by the thumbnail threads: the first to enter silences warnings,
+# the last to leave restores them
+_quiet_lock = threading.Lock()
+_quiet_depth = 0
+_saved_warnings = None
+
+
+@contextmanager
+def _quiet_warnings():
+    """Suppress truncated image warnings; safe to nest across threads."""
+    global _quiet_depth, _saved_warnings
+
+    def noop_showwarning(*args, **kwargs):
+        pass
+
+    with _quiet_lock:
+        if _quiet_depth == 0:
+            _saved_warnings = (warnings.filters.copy(), warnings.showwarning)
+            warnings.showwarning = noop_showwarning
+            warnings.filters = []
+        _quiet_depth += 1
+    try:
+        yield
+    finally:
+        with _quiet_lock:
+            _quiet_depth -= 1
+            if _quiet_depth == 0:
+                warnings.filters, warnings.showwarning = _saved_warnings
+
+
+def _make_thumbnail(data: bytes, thumb_path: Path) -> tuple[int, int]:
+    """Write a JPEG thumbnail of encoded image `data` to `thumb_path`; returns the full (width, height)."""
+    if pyvips is not None:
+        # The header gives the full size without decoding; thumbnail_buffer decodes at a
+        # reduced JPEG scale straight to the thumbnail size
+        header = pyvips.Image.new_from_buffer(data, "")
+        width, height = header.width, header.height
+        img = pyvips.Image.thumbnail_buffer(data, THUMB_SIZE, height=THUMB_SIZE, size="down")
+        if img.hasalpha():
+            img = img.flatten(background=255)
+        if img.interpretation not in ("srgb", "b-w"):
+            img = img.colourspace("srgb")
+        img.jpegsave(str(thumb_path), Q=85, optimize_coding=True, strip=True)
+        return width, height
+
+    with _quiet_warnings():
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        width, height = img.size
+
+    img = img.convert("RGB")
+    img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+    img.save(thumb_path, "JPEG", quality=85, optimize=True)
+    return width, height
+
 
 class ImageManager:
     _instance = None
     _lock = threading.Lock()
 
+    # Row shape of a new image; the statement text is fixed, so sqlite3's statement cache
+    # prepares it once. RETURNING yields no row when the image is a duplicate.
+    _INSERT_COLS = ('id', 'filename', 'path', 'thumb_path', 'url', 'source', 'query',
+                    'width', 'height', 'alt', 'tags', 'preview_only')
+    _INSERT_SQL = (
+        f"INSERT OR IGNORE INTO images ({', '.join(_INSERT_COLS)}) "
+        f"VALUES ({', '.join('?' * len(_INSERT_COLS))}) RETURNING id"
+    )
+    _INSERT_DEFAULTS = dict.fromkeys(_INSERT_COLS, '') | {'preview_only': 0}
+    _insert_values = staticmethod(operator.itemgetter(*_INSERT_COLS))
+
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -41,21 +162,60 @@ class ImageManager:
         self._initialized = True
         self._shutting_down = False
 
-        # Database connection (thread-safe reads allowed)
-        self.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-        self.conn.execute("PRAGMA foreign_keys = OFF")
-        self.conn.row_factory = sqlite3.Row
+        # Writer connection; every write in this class holds _write_lock for its transaction
+        self.conn = self._connect()
+        self._write_lock = threading.Lock()
 
         self._create_table_and_migrate()
 
+        # Pool of read-only connections, borrowed through _reader()
+        self._readers = queue.Queue()
+        for _ in range(DB_READERS):
+            self._readers.put(self._connect(read_only=True))
+
         # Load duplicate-tracking sets
         self.existing_urls = self._load_existing_urls()
+        self._inflight_urls = set()  # URLs being downloaded right now
+
+        # Inserts waiting for the next batched commit; touched only on the background loop
+        self._pending_inserts = []  # (values, future or None)
+        self._flush_handle = None
+
+        # Thumbnail decode/resize/encode runs here, off the event loop (PIL and libvips release the GIL)
+        self._thumb_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="Thumbnail")
+
+        # Bumped on every write (insert, update, delete) so callers can invalidate cached aggregates
+        self.data_version = 0
+
+        # Shared HTTP session (keep-alive pool), created lazily on the background loop
+        self._http = None
+        self._http_loop = None
+        self._prewarm_task = None
 
         # Background async loop for concurrent downloads/processing
         self.loop = None
         self.thread = threading.Thread(target=self._start_background_loop, daemon=True)
         self.thread.start()
 
+    @staticmethod
+    def _connect(read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        for pragma in DB_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute("PRAGMA query_only = 1")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _reader(self):
+        """Borrow a read-only connection from the pool."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
     def _create_table_and_migrate(self):
         """Create table and safely add new columns if they don't exist."""
         with self.conn:
@@ -81,6 +241,9 @@ class ImageManager:
             # Ensure unique index on url
             self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_url ON images(url);")
 
+            # Case-insensitive source filter (/api/v1/images?source=...)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_source_nocase ON images(source COLLATE NOCASE);")
+
             # Add vision_processed flag if missing
             try:
                 self.conn.execute("ALTER TABLE images ADD COLUMN vision_processed INTEGER DEFAULT 0")
@@ -88,6 +251,25 @@ class ImageManager:
             except sqlite3.OperationalError:
                 pass  # Already exists
 
+            # Unprocessed-image selection for the analyze endpoints. Keyed on the
+            # same COALESCE query_unprocessed filters on, so NULL flags from old rows match
+            self.conn.execute("DROP INDEX IF EXISTS idx_unprocessed_source;")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_unprocessed_flag_source "
+                "ON images(COALESCE(vision_processed, 0), source COLLATE NOCASE);"
+            )
+
+            # Newest-first listings (gallery, query_images default sort) read rows in index order
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_images_downloaded_at ON images(downloaded_at DESC);"
+            )
+
+            # Give the planner index statistics once; later runs keep them
+            if not self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone():
+                self.conn.execute("ANALYZE")
+
             # Table to track deleted URLs (prevents re-downloading)
             self.conn.execute("""
                 CREATE TABLE IF NOT EXISTS blocked_urls (
@@ -97,23 +279,30 @@ class ImageManager:
                 )
             """)
 
-    def _load_existing_urls(self) -> set[str]:
+    def _load_existing_urls(self) -> UrlFilter:
         """Load all existing URLs for fast duplicate checking (includes blocked URLs)."""
-        urls = set()
-
-        # Load URLs from images table
-        cur = self.conn.execute("SELECT url FROM images")
-        urls.update(row[0] for row in cur.fetchall())
+        count = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM images) + (SELECT COUNT(*) FROM blocked_urls)"
+        ).fetchone()[0]
+        urls = UrlFilter(initial_capacity=max(100_000, count * 2))
 
-        # Load blocked URLs (deleted images we don't want to re-download)
-        cur = self.conn.execute("SELECT url FROM blocked_urls")
-        urls.update(row[0] for row in cur.fetchall())
+        # Images plus blocked URLs (deleted images we don't want to re-download), streamed
+        cur = self.conn.execute("SELECT url FROM images UNION ALL SELECT url FROM blocked_urls")
+        urls.update(row[0] for row in cur)
 
         return urls
 
     def _start_background_loop(self):
         """Start the dedicated asyncio loop in a background thread."""
-        self.loop = asyncio.new_event_loop()
+        if uvloop is not None:
+            loop = uvloop.new_event_loop()
+            # Python 3.12+: tasks that finish without blocking never go through the scheduler
+            if hasattr(asyncio, "eager_task_factory"):
+                loop.set_task_factory(asyncio.eager_task_factory)
+        else:
+            # asyncio's default loop: Proactor on Windows, selector elsewhere
+            loop = asyncio.new_event_loop()
+        self.loop = loop
         asyncio.set_event_loop(self.loop)
         self.loop.run_forever()
 
@@ -156,12 +345,58 @@ class ImageManager:
                 return asyncio.run_coroutine_threadsafe(coro, self.loop)
             raise
 
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Shared ClientSession for the background loop, so downloads reuse pooled connections."""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.closed or self._http_loop is not loop:
+            resolver = None  # aiohttp's threaded getaddrinfo resolver
+            if aiodns is not None:
+                try:
+                    resolver = aiohttp.AsyncResolver()
+                except Exception as e:
+                    # Older aiodns refuses the Windows ProactorEventLoop
+                    logger.warning(f"[ImageManager] aiodns unavailable, using threaded DNS: {e}")
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100, limit_per_host=20, keepalive_timeout=30,
+                    ttl_dns_cache=DNS_CACHE_TTL, resolver=resolver
+                )
+            )
+            self._http_loop = loop
+            self._prewarm_task = loop.create_task(self._prewarm_hosts(self._http))
+        return self._http
+
+    async def _prewarm_hosts(self, session: aiohttp.ClientSession):
+        """Resolve and connect to the image CDNs up front, so first downloads skip DNS/TLS setup."""
+        async def touch(host):
+            try:
+                async with session.head(f"https://{host}/", timeout=aiohttp.ClientTimeout(total=5)):
+                    pass
+            except Exception as e:
+                logger.debug(f"[ImageManager] Prewarm {host}: {e}")
+
+        await asyncio.gather(*(touch(host) for host in CDN_HOSTS))
+
+    async def _close_session(self):
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
     def shutdown(self):
         """Aggressively stop all downloads and shutdown the background loop."""
         self._shutting_down = True
         logger.info("[ImageManager] Shutdown requested - cancelling all tasks...")
 
         if self.loop and self.loop.is_running():
+            # Commit rows still waiting for a batch flush before tasks are cancelled
+            self.loop.call_soon_threadsafe(self._flush_inserts)
+
+            # Close the shared session while the loop can still run it
+            try:
+                asyncio.run_coroutine_threadsafe(self._close_session(), self.loop).result(timeout=1)
+            except Exception as e:
+                logger.debug(f"[ImageManager] Session close: {e}")
+
             # Cancel all pending tasks
             def cancel_all():
                 try:
@@ -173,6 +408,7 @@ class ImageManager:
                 self.loop.stop()
 
             self.loop.call_soon_threadsafe(cancel_all)
+            self._thumb_executor.shutdown(wait=False, cancel_futures=True)
 
             # Wait briefly for loop to stop
             import time
@@ -184,38 +420,73 @@ class ImageManager:
         logger.info("[ImageManager] Shutdown complete")
 
     def is_url_saved(self, url: str) -> bool:
-        """Quick in-memory check if URL is already saved."""
-        return url in self.existing_urls
+        """Check if URL is already saved or blocked; filter misses never touch the DB."""
+        if url not in self.existing_urls:
+            return False
+        try:
+            with self._reader() as conn:
+                return conn.execute(
+                    "SELECT EXISTS(SELECT 1 FROM images WHERE url = ?) OR EXISTS(SELECT 1 FROM blocked_urls WHERE url = ?)",
+                    (url, url)
+                ).fetchone()[0] == 1
+        except sqlite3.Error:
+            return True
 
     def add_image(self, metadata: dict):
-        """Insert image metadata into DB, ignoring duplicates."""
-        columns = [
-            'id', 'filename', 'path', 'thumb_path', 'url', 'source', 'query',
-            'width', 'height', 'alt', 'tags', 'preview_only'
-        ]
-        placeholders = ", ".join(["?"] * len(columns))
-        column_names = ", ".join(columns)
-
-        values = tuple(
-            metadata.get(col, '') if col not in ('preview_only',) else metadata.get(col, 0)
-            for col in columns
-        )
+        """Queue image metadata for the next batched insert, ignoring duplicates."""
+        values = self._insert_values(self._INSERT_DEFAULTS | metadata)
+
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._queue_insert, values)
+            return
+
+        # No background loop (shutdown) - write it straight away
+        self._pending_inserts.append((values, None))
+        self._flush_inserts()
+
+    async def insert_image(self, metadata: dict) -> bool:
+        """Insert image metadata with the next batched commit; False if it was a duplicate."""
+        return await self._queue_insert(self._insert_values(self._INSERT_DEFAULTS | metadata))
+
+    def _queue_insert(self, values: tuple) -> asyncio.Future:
+        """Add a row to the pending batch; the future resolves to True if it was inserted."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_inserts.append((values, future))
+        if len(self._pending_inserts) >= INSERT_BATCH_SIZE:
+            self._flush_inserts()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(INSERT_FLUSH_DELAY, self._flush_inserts)
+        return future
+
+    def _flush_inserts(self):
+        """Insert every pending row in one transaction and resolve their futures."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending_inserts = self._pending_inserts, []
+        if not pending:
+            return
 
         try:
-            with self.conn:
-                self.conn.execute(f"""
-                    INSERT OR IGNORE INTO images ({column_names})
-                    VALUES ({placeholders})
-                """, values)
-
-            url = metadata['url']
-            if url not in self.existing_urls:
-                self.existing_urls.add(url)
-
-        except sqlite3.IntegrityError:
-            pass
+            with self._write_lock, self.conn:
+                inserted = [
+                    self.conn.execute(self._INSERT_SQL, values).fetchone() is not None
+                    for values, _ in pending
+                ]
         except Exception as e:
             logger.error(f"[DB INSERT ERROR] {e}")
+            for _, future in pending:
+                if future is not None and not future.done():
+                    future.set_result(False)
+            return
+
+        for (values, future), ok in zip(pending, inserted):
+            self.existing_urls.add(values[4])
+            if future is not None and not future.done():
+                future.set_result(ok)
+        if any(inserted):
+            self.data_version += 1
 
     @staticmethod
     def generate_filename(tags: list, width: int, height: int, ext: str = ".jpg") -> str:
@@ -226,54 +497,48 @@ class ImageManager:
         return f"{safe_tags}_{width}x{height}_{unique_id}{ext}"
 
     async def create_thumbnail(self, session: aiohttp.ClientSession, url: str) -> dict | None:
-        """Fetch just enough data to make thumbnail + get size. No full save."""
+        """Fetch just enough data to make thumbnail + get size. No full save.
+
+        The fetched bytes come back as "data" ("complete" when that is the whole
+        file) so download_and_save can reuse them for the original.
+        """
         if self._shutting_down:
             return None
 
         try:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            # Identity encoding keeps byte offsets valid for a follow-up Range request
+            async with session.get(url, headers={"Accept-Encoding": "identity"},
+                                   timeout=aiohttp.ClientTimeout(total=30)) as resp:
                 if resp.status != 200:
                     return None
 
                 data = io.BytesIO()
+                complete = True
                 async for chunk in resp.content.iter_chunked(1024 * 1024):
                     if self._shutting_down:
                         return None
                     data.write(chunk)
                     if data.tell() > 3 * 1024 * 1024:
+                        complete = False
                         break
-
-                data.seek(0)
-
-                # Suppress truncated image warnings
-                original_filters = warnings.filters.copy()
-                original_showwarning = warnings.showwarning
-
-                def noop_showwarning(*args, **kwargs):
-                    pass
-
-                warnings.showwarning = noop_showwarning
-                warnings.filters = []
-
-                try:
-                    img = Image.open(data)
-                    img.load()
-                    width, height = img.size
-                finally:
-                    warnings.showwarning = original_showwarning
-                    warnings.filters = original_filters
-
-                img = img.convert("RGB")
-                img.thumbnail((300, 300))
+                content_type = resp.headers.get("Content-Type", "")
+                # If-Range takes a strong ETag or a date; anything else can't guard a resume
+                etag = resp.headers.get("ETag", "")
+                validator = etag if etag and not etag.startswith("W/") else resp.headers.get("Last-Modified")
 
                 thumb_filename = f"thumb_{uuid.uuid4().hex[:12]}.jpg"
-                thumb_path = THUMBS_DIR / thumb_filename
-                img.save(thumb_path, "JPEG", quality=85, optimize=True)
+                width, height = await asyncio.get_running_loop().run_in_executor(
+                    self._thumb_executor, _make_thumbnail, data.getvalue(), THUMBS_DIR / thumb_filename
+                )
 
                 return {
                     "thumb_path": f"images/thumbs/{thumb_filename}",
                     "width": width,
-                    "height": height
+                    "height": height,
+                    "data": data.getvalue(),
+                    "complete": complete,
+                    "content_type": content_type,
+                    "validator": validator
                 }
 
         except asyncio.CancelledError:
@@ -283,24 +548,74 @@ class ImageManager:
                 logger.error(f"[THUMBNAIL ERROR] {url}: {e}")
             return None
 
+    async def _save_original(self, session: aiohttp.ClientSession, url: str, thumb_info: dict,
+                             filepath: Path) -> bool:
+        """Write the original to `filepath`, starting from the bytes the thumbnail fetch already has.
+
+        Only the remainder is requested, with a Range header guarded by If-Range on
+        the first response's ETag or Last-Modified. A server that ignores the range
+        or whose file changed sends the whole file again, which replaces the prefix;
+        a partial response that doesn't start where the prefix ends is discarded and
+        the whole file fetched. Returns False on a failed response.
+        """
+        data = thumb_info["data"]
+        timeout = aiohttp.ClientTimeout(total=60)
+
+        async def copy(resp, f):
+            # Stream straight to the file so an original is never held in memory whole
+            async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                if self._shutting_down:
+                    raise asyncio.CancelledError
+                f.write(chunk)
+
+        try:
+            with open(filepath, "wb") as f:
+                f.write(data)
+                if thumb_info["complete"]:
+                    return True
+
+                validator = thumb_info.get("validator")
+                if validator:
+                    headers = {"Accept-Encoding": "identity", "Range": f"bytes={len(data)}-",
+                               "If-Range": validator}
+                    async with session.get(url, headers=headers, timeout=timeout) as resp:
+                        content_range = resp.headers.get("Content-Range", "")
+                        if resp.status == 206 and content_range.startswith(f"bytes {len(data)}-"):
+                            await copy(resp, f)
+                            return True
+                        if resp.status == 200:
+                            f.seek(0)
+                            f.truncate()
+                            await copy(resp, f)
+                            return True
+                        if resp.status not in (206, 416):
+                            return False
+
+                # No safe way to resume: fetch the whole file over the prefix
+                f.seek(0)
+                f.truncate()
+                async with session.get(url, headers={"Accept-Encoding": "identity"}, timeout=timeout) as resp:
+                    if resp.status != 200:
+                        return False
+                    await copy(resp, f)
+            return True
+        except BaseException:
+            filepath.unlink(missing_ok=True)
+            raise
+
     async def download_and_save(self, session: aiohttp.ClientSession, url: str, tags: list,
                                 source: str, query: str, alt: str = "", preview_only: bool = False) -> dict | None:
         if self._shutting_down:
             return None
 
         # Thread-safe duplicate check
-        if url in self.existing_urls:
+        if self.is_url_saved(url):
             return None
 
-        try:
-            with self.conn:
-                cur = self.conn.cursor()
-                cur.execute("SELECT 1 FROM images WHERE url = ?", (url,))
-                if cur.fetchone():
-                    self.existing_urls.add(url)
-                    return None
-        except sqlite3.Error:
-            pass
+        # Another concurrent download is already fetching this URL
+        if url in self._inflight_urls:
+            return None
+        self._inflight_urls.add(url)
 
         try:
             thumb_info = await self.create_thumbnail(session, url)
@@ -309,16 +624,13 @@ class ImageManager:
 
             original_path = None
             if not preview_only:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=60)) as resp:
-                    if resp.status != 200:
-                        return None
-                    data = await resp.read()
-
-                content_type = resp.headers.get("Content-Type", "")
-                ext = ".jpg" if "jpeg" in content_type.lower() else ".png"
+                ext = ".jpg" if "jpeg" in thumb_info["content_type"].lower() else ".png"
                 filename = self.generate_filename(tags, thumb_info["width"], thumb_info["height"], ext)
                 filepath = ORIGINALS_DIR / filename
-                filepath.write_bytes(data)
+                if not await self._save_original(session, url, thumb_info, filepath):
+                    filepath.unlink(missing_ok=True)
+                    (PROJECT_ROOT / thumb_info["thumb_path"]).unlink(missing_ok=True)
+                    return None
                 original_path = f"images/originals/{filename}"
 
             metadata = {
@@ -336,30 +648,16 @@ class ImageManager:
                 "preview_only": 1 if preview_only else 0
             }
 
-            # Direct DB insert (thread-safe with connection)
-            try:
-                with self.conn:
-                    self.conn.execute("""
-                        INSERT OR IGNORE INTO images
-                        (id, filename, path, thumb_path, url, source, query, width, height, alt, tags, preview_only)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        metadata['id'],
-                        metadata['filename'],
-                        metadata['path'],
-                        metadata['thumb_path'],
-                        metadata['url'],
-                        metadata['source'],
-                        metadata['query'],
-                        metadata['width'],
-                        metadata['height'],
-                        metadata['alt'],
-                        metadata['tags'],
-                        metadata['preview_only']
-                    ))
-                self.existing_urls.add(url)
-            except sqlite3.IntegrityError:
-                pass
+            # Committed with the other downloads in the current batch. False when another
+            # download saved this URL while we were fetching it.
+            inserted = await self._queue_insert(self._insert_values(metadata))
+
+            if not inserted:
+                # Lost the race - drop the files this attempt wrote
+                for rel_path in (original_path, thumb_info["thumb_path"]):
+                    if rel_path:
+                        (PROJECT_ROOT / rel_path).unlink(missing_ok=True)
+                return None
 
             return metadata
 
@@ -368,6 +666,8 @@ class ImageManager:
         except Exception as e:
             logger.error(f"[SAVE ERROR] {url}: {e}")
             return None
+        finally:
+            self._inflight_urls.discard(url)
 
     async def search_pixabay(self, session: aiohttp.ClientSession, query: str, page: int = 1, per_page: int = 200):
         if not PIXABAY_KEY:
@@ -447,56 +747,65 @@ class ImageManager:
                     return []
                 data = await resp.json()
 
-                fetch_tasks = []
-                for photo in data.get("results", []):
-                    photo_id = photo.get("id")
-                    if photo_id:
-                        full_url = f"https://api.unsplash.com/photos/{photo_id}"
-                        fetch_tasks.append(session.get(full_url, headers=headers, timeout=15))
+            sem = asyncio.Semaphore(UNSPLASH_DETAIL_CONCURRENCY)
 
-                full_responses = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+            async def fetch_detail(search_photo):
+                # Per-photo details carry the tags the search endpoint omits
+                async with sem:
+                    async with session.get(f"https://api.unsplash.com/photos/{search_photo['id']}",
+                                           headers=headers, timeout=15) as full_resp:
+                        if full_resp.status != 200:
+                            return search_photo, None
+                        return search_photo, await full_resp.json()
 
-                results = []
+            pending = [
+                fetch_detail(photo) for photo in data.get("results", [])
+                if photo.get("id") and not self.is_url_saved(photo["urls"]["full"])
+            ]
+
+            results = []
+            for next_detail in asyncio.as_completed(pending):
                 try:
-                    for search_photo, full_resp in zip(data.get("results", []), full_responses):
-                        if isinstance(full_resp, Exception):
-                            continue
-                        if not isinstance(full_resp, aiohttp.ClientResponse):
-                            continue
-                        if full_resp.status != 200:
-                            full_resp.close()
-                            continue
-
-                        try:
-                            full_data = await full_resp.json()
-                        finally:
-                            full_resp.close()
-
-                        img_url = search_photo["urls"]["full"]
-                        if self.is_url_saved(img_url):
-                            continue
-
-                        tags = [tag.get("title", "") for tag in full_data.get("tags", []) if tag.get("title")]
-                        alt = full_data.get("alt_description", "") or full_data.get("description", "") or ""
-
-                        results.append({
-                            "url": img_url,
-                            "tags": tags,
-                            "source": "Unsplash",
-                            "query": query,
-                            "alt": alt
-                        })
-                finally:
-                    # Ensure all responses are closed even if loop exits early
-                    for resp in full_responses:
-                        if isinstance(resp, aiohttp.ClientResponse) and not resp.closed:
-                            resp.close()
+                    search_photo, full_data = await next_detail
+                except Exception:
+                    continue
+                if full_data is None:
+                    continue
 
-                return results
+                tags = [tag.get("title", "") for tag in full_data.get("tags", []) if tag.get("title")]
+                alt = full_data.get("alt_description", "") or full_data.get("description", "") or ""
+
+                results.append({
+                    "url": search_photo["urls"]["full"],
+                    "tags": tags,
+                    "source": "Unsplash",
+                    "query": query,
+                    "alt": alt
+                })
+
+            return results
         except Exception as e:
             logger.error(f"[UNSPLASH ERROR] {e}")
             return []
 
+    def _search_requests(self, session, query: str, sources: dict) -> list:
+        """One search coroutine per requested page of each source."""
+        tasks = []
+
+        if (pages := sources.get("pixabay", 0)) > 0:
+            for page in range(1, pages + 1):
+                tasks.append(self.search_pixabay(session, query, page=page))
+
+        if (pages := sources.get("pexels", 0)) > 0:
+            for page in range(1, pages + 1):
+                tasks.append(self.search_pexels(session, query, page=page))
+
+        if (pages := sources.get("unsplash", 0)) > 0:
+            for page in range(1, pages + 1):
+                tasks.append(self.search_unsplash(session, query, page=page))
+
+        return tasks
+
     async def search_all(self, query: str, sources: dict) -> list:
         """
         sources = {
@@ -505,92 +814,286 @@ class ImageManager:
             "unsplash": 1    # fetch 1 page from Unsplash
         }
         """
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-
-            if (pages := sources.get("pixabay", 0)) > 0:
-                for page in range(1, pages + 1):
-                    tasks.append(self.search_pixabay(session, query, page=page))
-
-            if (pages := sources.get("pexels", 0)) > 0:
-                for page in range(1, pages + 1):
-                    tasks.append(self.search_pexels(session, query, page=page))
-
-            if (pages := sources.get("unsplash", 0)) > 0:
-                for page in range(1, pages + 1):
-                    tasks.append(self.search_unsplash(session, query, page=page))
-
-            all_results = await asyncio.gather(*tasks, return_exceptions=True)
-            combined = []
-            for result_list in all_results:
-                if isinstance(result_list, list):
-                    combined.extend(result_list)
-            return combined
+        session = await self.get_session()
+        tasks = self._search_requests(session, query, sources)
+
+        all_results = await asyncio.gather(*tasks, return_exceptions=True)
+        combined = []
+        for result_list in all_results:
+            if isinstance(result_list, list):
+                combined.extend(result_list)
+        return combined
+
+    async def iter_search_all(self, query: str, sources: dict):
+        """Like search_all, but yield each page's results as soon as that page arrives."""
+        session = await self.get_session()
+        for next_page in asyncio.as_completed(self._search_requests(session, query, sources)):
+            try:
+                result_list = await next_page
+            except Exception:
+                continue
+            if isinstance(result_list, list):
+                yield result_list
 
     def get_all_images(self):
-        cur = self.conn.cursor()
-        cur.execute("SELECT * FROM images ORDER BY downloaded_at DESC")
-        rows = cur.fetchall()
+        with self._reader() as conn:
+            cur = conn.execute("SELECT * FROM images ORDER BY downloaded_at DESC")
+            rows = cur.fetchall()
         columns = [desc[0] for desc in cur.description]
         return [dict(zip(columns, row)) for row in rows]
 
+    # Known images-table columns; only these are ever interpolated into SQL
+    IMAGE_COLUMNS = {
+        'id', 'filename', 'path', 'thumb_path', 'url', 'source', 'query', 'width', 'height',
+        'alt', 'tags', 'preview_only', 'downloaded_at', 'vision_processed'
+    }
+
+    def query_images(self, filters: dict, sort_field: str = 'downloaded_at', sort_order: str = 'desc',
+                     limit: int = 50, offset: int = 0) -> tuple[list[dict], int]:
+        """Filter, sort and paginate images in SQL. Returns (page_rows, total_matches)."""
+        where = []
+        params = []
+
+        if filters.get('source'):
+            sources = filters['source'] if isinstance(filters['source'], list) else [filters['source']]
+            where.append(f"source COLLATE NOCASE IN ({', '.join('?' * len(sources))})")
+            params.extend(str(s) for s in sources)
+
+        if filters.get('query'):
+            # LIKE is case-insensitive; escape its wildcards for a plain substring match
+            q = str(filters['query']).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append("query LIKE ? ESCAPE '\\'")
+            params.append(f"%{q}%")
+
+        if filters.get('tags_contain'):
+            tags_filter = filters['tags_contain']
+            if isinstance(tags_filter, str):
+                tags_filter = [tags_filter]
+            where.append(f"""EXISTS (
+                SELECT 1 FROM json_each(CASE WHEN json_valid(tags) THEN tags ELSE '[]' END)
+                WHERE lower(value) IN ({', '.join('?' * len(tags_filter))})
+            )""")
+            params.extend(str(t).lower() for t in tags_filter)
+
+        for key, column, op in (('width_min', 'width', '>='), ('width_max', 'width', '<='),
+                                ('height_min', 'height', '>='), ('height_max', 'height', '<=')):
+            if filters.get(key):
+                where.append(f"COALESCE({column}, 0) {op} ?")
+                params.append(filters[key])
+
+        for flag in ('vision_processed', 'preview_only'):
+            if flag in filters:
+                where.append(f"COALESCE({flag}, 0) {'!=' if filters[flag] else '='} 0")
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        if sort_field not in self.IMAGE_COLUMNS:
+            sort_field = 'downloaded_at'
+        direction = 'DESC' if str(sort_order).lower() == 'desc' else 'ASC'
+
+        with self._reader() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM images {where_sql}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM images {where_sql} ORDER BY {sort_field} {direction} LIMIT ? OFFSET ?",
+                (*params, max(0, limit), max(0, offset))
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _update_sql(columns: tuple) -> str:
+        """UPDATE statement for a sorted column tuple, built once per column set."""
+        return f"UPDATE images SET {', '.join(f'{col} = ?' for col in columns)} WHERE id = ?"
+
+    def update_image_fields(self, image_id: str, fields: dict) -> int:
+        """Update columns of one image. Returns the number of rows changed."""
+        columns = tuple(sorted(fields))
+        unknown = set(columns) - self.IMAGE_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown image columns: {', '.join(sorted(unknown))}")
+
+        with self._write_lock, self.conn:
+            cur = self.conn.execute(
+                self._update_sql(columns),
+                [fields[col] for col in columns] + [image_id]
+            )
+        if cur.rowcount:
+            self.data_version += 1
+        return cur.rowcount
+
+    def apply_analysis_batch(self, rows: list) -> int:
+        """Mark images vision-processed in one transaction.
+
+        `rows` are (alt, tags_json, image_id) tuples; a None alt or tags keeps
+        the stored value. Returns the number of rows changed.
+        """
+        if not rows:
+            return 0
+        # One statement for the whole batch: the rows travel as a single JSON parameter
+        with self._write_lock, self.conn:
+            cur = self.conn.execute("""
+                UPDATE images SET vision_processed = 1,
+                    alt = COALESCE(upd.alt, images.alt),
+                    tags = COALESCE(upd.tags, images.tags)
+                FROM (
+                    SELECT json_extract(value, '$[0]') AS alt,
+                           json_extract(value, '$[1]') AS tags,
+                           json_extract(value, '$[2]') AS id
+                    FROM json_each(?)
+                ) AS upd
+                WHERE images.id = upd.id
+            """, (json.dumps([list(row) for row in rows]),))
+        if cur.rowcount:
+            self.data_version += 1
+        return cur.rowcount
+
+    def get_stats(self, top_queries: int = 20) -> dict:
+        """Aggregate image counts with SQL GROUP BY instead of loading every row."""
+        with self._reader() as conn:
+            total, vision_processed = conn.execute(
+                "SELECT COUNT(*), COUNT(NULLIF(vision_processed, 0)) FROM images"
+            ).fetchone()
+            by_source = dict(conn.execute(
+                "SELECT source, COUNT(*) FROM images GROUP BY source"
+            ).fetchall())
+        return {
+            'total_images': total,
+            'by_source': by_source,
+            'by_query': dict(self.top_queries(top_queries)),
+            'vision_processed': vision_processed
+        }
+
+    def top_queries(self, limit: int = 20) -> list[tuple[str, int]]:
+        """Most frequent search queries as (query, count), largest first."""
+        with self._reader() as conn:
+            return [tuple(row) for row in conn.execute(
+                "SELECT query, COUNT(*) AS n FROM images GROUP BY query ORDER BY n DESC LIMIT ?",
+                (limit,)
+            ).fetchall()]
+
+    def query_unprocessed(self, sources: list = None, limit: int = 100,
+                          reprocess_short: bool = False, reprocess_few_tags: bool = False) -> list[dict]:
+        """Newest images that need vision analysis, filtered in SQL.
+
+        Unprocessed images always match. Processed ones match when
+        `reprocess_short` is set and the caption is under 50 characters, or
+        otherwise when `reprocess_few_tags` is set and they have at most one tag.
+        """
+        needs = ["COALESCE(vision_processed, 0) = 0"]
+        if reprocess_short:
+            needs.append("length(COALESCE(alt, '')) < 50")
+        elif reprocess_few_tags:
+            needs.append(
+                "NOT json_valid(COALESCE(NULLIF(tags, ''), '[]')) "
+                "OR json_array_length(COALESCE(NULLIF(tags, ''), '[]')) <= 1"
+            )
+        where = [f"({' OR '.join(needs)})"]
+        params = []
+
+        if sources:
+            where.append(f"source COLLATE NOCASE IN ({', '.join('?' * len(sources))})")
+            params.extend(str(s) for s in sources)
+
+        with self._reader() as conn:
+            cur = conn.execute(
+                f"SELECT * FROM images WHERE {' AND '.join(where)} ORDER BY downloaded_at DESC LIMIT ?",
+                params + [int(limit)]
+            )
+            return [dict(row) for row in cur.fetchall()]
+
+    def get_images_by_ids(self, image_ids: list) -> list[dict]:
+        """Fetch the given images, newest first; unknown ids are skipped."""
+        if not image_ids:
+            return []
+        with self._reader() as conn:
+            cur = conn.execute(
+                "SELECT * FROM images WHERE id IN (SELECT value FROM json_each(?)) ORDER BY downloaded_at DESC",
+                (json.dumps([str(i) for i in image_ids]),)
+            )
+            return [dict(row) for row in cur.fetchall()]
+
+    def get_thumb_paths(self, image_ids: list) -> dict:
+        """Map image id -> thumb_path for the given ids, in one query."""
+        if not image_ids:
+            return {}
+        with self._reader() as conn:
+            cur = conn.execute(
+                f"SELECT id, thumb_path FROM images WHERE id IN ({', '.join('?' * len(image_ids))})",
+                list(image_ids)
+            )
+            return {row[0]: row[1] for row in cur.fetchall() if row[1]}
+
+    def get_tags_by_ids(self, image_ids: list) -> dict:
+        """Map image id -> stored tags JSON text for the given ids, in one query."""
+        if not image_ids:
+            return {}
+        with self._reader() as conn:
+            cur = conn.execute(
+                "SELECT id, tags FROM images WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([str(i) for i in image_ids]),)
+            )
+            return {row[0]: row[1] for row in cur.fetchall() if row[1]}
+
+    def get_image_by_id(self, image_id: str) -> dict | None:
+        """Fetch a single image row by primary key."""
+        with self._reader() as conn:
+            cur = conn.execute("SELECT * FROM images WHERE id = ? LIMIT 1", (image_id,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+
     def delete_images(self, image_ids: list) -> tuple[int, int]:
         """Delete images from database and filesystem."""
         if not image_ids:
             return (0, 0)
 
-        deleted = 0
-        failed = 0
-
-        for img_id in image_ids:
-            try:
-                cur = self.conn.cursor()
-                cur.execute("SELECT url, path, thumb_path FROM images WHERE id = ?", (img_id,))
-                row = cur.fetchone()
-
-                if not row:
-                    failed += 1
-                    continue
-
-                url, original_path, thumb_path = row
-
-                if original_path:
-                    full_path = PROJECT_ROOT / original_path
-                    if full_path.exists():
-                        try:
-                            full_path.unlink()
-                        except Exception as e:
-                            logger.error(f"[DELETE FILE ERROR] {full_path}: {e}")
-
-                if thumb_path:
-                    full_thumb = PROJECT_ROOT / thumb_path
-                    if full_thumb.exists():
-                        try:
-                            full_thumb.unlink()
-                        except Exception as e:
-                            logger.error(f"[DELETE THUMB ERROR] {full_thumb}: {e}")
-
-                cur.execute("SELECT source FROM images WHERE id = ?", (img_id,))
-                source_row = cur.fetchone()
-                source = source_row[0] if source_row else ""
-
-                with self.conn:
-                    self.conn.execute("DELETE FROM images WHERE id = ?", (img_id,))
-                    if url:
-                        self.conn.execute(
-                            "INSERT OR IGNORE INTO blocked_urls (url, source) VALUES (?, ?)",
-                            (url, source)
-                        )
-
-                deleted += 1
-
-            except Exception as e:
-                logger.error(f"[DELETE ERROR] Image {img_id}: {e}")
-                failed += 1
+        # One lookup for every id; ids with no row count as failed
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT id, url, path, thumb_path, source FROM images WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([str(i) for i in image_ids]),)
+            ).fetchall()
+        failed = len(set(map(str, image_ids))) - len(rows)
+
+        for _, _, original_path, thumb_path, _ in rows:
+            if original_path:
+                full_path = PROJECT_ROOT / original_path
+                if full_path.exists():
+                    try:
+                        full_path.unlink()
+                    except Exception as e:
+                        logger.error(f"[DELETE FILE ERROR] {full_path}: {e}")
+
+            if thumb_path:
+                full_thumb = PROJECT_ROOT / thumb_path
+                if full_thumb.exists():
+                    try:
+                        full_thumb.unlink()
+                    except Exception as e:
+                        logger.error(f"[DELETE THUMB ERROR] {full_thumb}: {e}")
+
+        # Delete the rows and block their URLs in a single transaction
+        try:
+            with self._write_lock, self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO blocked_urls (url, source) VALUES (?, ?)",
+                    [(url, source or "") for _, url, _, _, source in rows if url]
+                )
+                self.conn.executemany("DELETE FROM images WHERE id = ?", [(row[0],) for row in rows])
+            deleted = len(rows)
+        except Exception as e:
+            logger.error(f"[DELETE ERROR] {len(rows)} images: {e}")
+            deleted = 0
+            failed += len(rows)
 
+        if deleted:
+            self.data_version += 1
         return (deleted, failed)
 
     def close(self):
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
         if self.conn:
             self.conn.close()
 
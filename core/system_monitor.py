@@ -11,6 +11,9 @@ from core import logger
 _nvml_available = False
 _nvml_initialized = False
 
+# Static GPU info (name, total VRAM) - never changes, queried once
+_static_gpu_info = None
+
 try:
     import pynvml
     _nvml_available = True
@@ -117,6 +120,53 @@ def get_gpu_stats(index: int = 0) -> Optional[dict]:
         return None
 
 
+def get_all_gpu_static_info() -> list:
+    """Get name and total VRAM (MB) for all GPUs in one pass, cached after first call."""
+    global _static_gpu_info
+    if _static_gpu_info is not None:
+        return _static_gpu_info
+
+    if not _nvml_initialized:
+        _init_nvml()
+    if not _nvml_initialized:
+        return []
+
+    results = []
+    try:
+        for i in range(pynvml.nvmlDeviceGetCount()):
+            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+            name = pynvml.nvmlDeviceGetName(handle)
+            if isinstance(name, bytes):
+                name = name.decode('utf-8')
+            mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
+            results.append({
+                "index": i,
+                "name": name,
+                "memory_total": mem.total / (1024 ** 2)
+            })
+    except Exception as e:
+        logger.error(f"[SystemMonitor] GPU static info query failed: {e}")
+        return results
+
+    _static_gpu_info = results
+    return results
+
+
+def get_cuda_driver_version() -> Optional[str]:
+    """Get the CUDA version the installed NVIDIA driver supports (e.g. "12.4")."""
+    if not _nvml_initialized:
+        _init_nvml()
+    if not _nvml_initialized:
+        return None
+
+    try:
+        version = pynvml.nvmlSystemGetCudaDriverVersion()
+        return f"{version // 1000}.{version % 1000 // 10}"
+    except Exception as e:
+        logger.error(f"[SystemMonitor] CUDA driver version query failed: {e}")
+        return None
+
+
 def get_all_gpu_stats() -> list:
     """Get stats for all GPUs."""
     count = get_gpu_count()
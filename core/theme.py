@@ -6,6 +6,7 @@ Supports light and dark modes with consistent color palettes.
 
 import os
 import json
+import functools
 from pathlib import Path
 
 # Config file location
@@ -149,6 +150,7 @@ _load_saved_theme()
 # PUBLIC API
 # ============================================================================
 
+@functools.cache
 def get_color(name: str) -> str:
     """Get a color from the current theme."""
     return _current_palette.get(name, "#ff00ff")
@@ -164,6 +166,7 @@ def get_theme_name() -> str:
     return _current_theme_name
 
 
+@functools.cache
 def is_dark() -> bool:
     """Check if dark theme is active."""
     return _current_theme_name == "dark"
@@ -180,6 +183,10 @@ def set_theme(theme_name: str):
         _current_theme_name = "light"
         _current_palette = LIGHT
 
+    # Theme lookups are memoized - drop values from the old palette
+    get_color.cache_clear()
+    is_dark.cache_clear()
+
     _save_theme()
 
 
@@ -205,6 +212,7 @@ FONTS = {
 }
 
 
+@functools.cache
 def get_font(name: str) -> tuple:
     """Get a font tuple."""
     return FONTS.get(name, FONTS["body"])
@@ -0,0 +1,89 @@
+# core/url_filter.py
+# Compact membership filter for already-saved image URLs
+
+import hashlib
+import math
+import threading
+
+try:
+    import xxhash  # Faster hashing when installed
+except ImportError:
+    xxhash = None
+
+
+def _url_hash(url: str) -> tuple[int, int]:
+    """Two independent 64-bit hashes of a URL, combined for the k probe positions."""
+    data = url.encode("utf-8", "surrogatepass")
+    if xxhash is not None:
+        digest = xxhash.xxh3_128_intdigest(data)
+    else:
+        digest = int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "little")
+    return digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+
+
+class _BloomLayer:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, hashes: tuple[int, int]):
+        h1, h2 = hashes
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def __contains__(self, hashes: tuple[int, int]) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(hashes))
+
+    def add(self, hashes: tuple[int, int]):
+        bits, size = self.bits, self.size
+        h1, h2 = hashes
+        for i in range(self.hash_count):
+            pos = (h1 + i * h2) % size
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class UrlFilter:
+    """Scalable Bloom filter over URLs.
+
+    Answers "definitely not seen" exactly and "maybe seen" with roughly
+    `error_rate` false positives, so a hit has to be confirmed against the
+    database. When the newest layer fills up a larger one is stacked on top,
+    keeping the overall false-positive rate bounded as the library grows.
+    """
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.001):
+        self.error_rate = error_rate
+        self._layers = [_BloomLayer(initial_capacity, error_rate / 2)]
+        self._lock = threading.Lock()
+
+    def __contains__(self, url: str) -> bool:
+        hashes = _url_hash(url)
+        return any(hashes in layer for layer in self._layers)
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self._layers)
+
+    def add(self, url: str):
+        hashes = _url_hash(url)
+        with self._lock:
+            if any(hashes in layer for layer in self._layers):
+                return
+            self._add_hashes(hashes)
+
+    def update(self, urls):
+        """Bulk add for startup; skips the per-URL duplicate check since the inputs are unique."""
+        with self._lock:
+            for url in urls:
+                self._add_hashes(_url_hash(url))
+
+    def _add_hashes(self, hashes: tuple[int, int]):
+        layer = self._layers[-1]
+        if layer.count >= layer.capacity:
+            # Each new layer is twice as large with a tighter error rate
+            layer = _BloomLayer(layer.capacity * 2, self.error_rate / 2 ** (len(self._layers) + 1))
+            self._layers.append(layer)
+        layer.add(hashes)
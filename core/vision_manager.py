@@ -4,7 +4,7 @@ import json
 import threading
 import os
 import tkinter as tk
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, List
 from core import logger
 
 
@@ -19,10 +19,15 @@ class VisionManager:
         # For async request/response matching
         self.pending_callbacks: Dict[int, Callable[[Dict[str, Any]], None]] = {}
         self.next_request_id = 0
+        self._send_lock = threading.Lock()  # Guards request ids + stdin writes
+
+        # Bumped on every load, so holders of a manager can tell a reloaded worker apart
+        self.generation = 0
 
     def load(self, device_spec):
         if self.process is not None:
             self.unload()
+        self.generation += 1
 
         script_dir = os.path.dirname(os.path.abspath(__file__))
         worker_path = os.path.join(script_dir, "..", "vision_worker.py")
@@ -49,13 +54,17 @@ class VisionManager:
             env=env
         )
 
+        # The reader outlives a reload, so it only touches its own process and generation
+        process = self.process
+        generation = self.generation
+
         def reader():
             logger.debug("[VISION MANAGER] Reader thread started")
-            if self.process.stdout is None:
+            if process.stdout is None:
                 logger.error("[VISION MANAGER] stdout is None!")
                 return
 
-            for line in self.process.stdout:
+            for line in process.stdout:
                 line = line.rstrip()
                 if not line:
                     continue
@@ -103,6 +112,10 @@ class VisionManager:
                 except json.JSONDecodeError:
                     pass
 
+            # Worker exited; nothing will answer the requests still waiting,
+            # unless a reload already replaced it and owns the pending requests
+            self._fail_pending("Worker exited", generation)
+
         self.reader_thread = threading.Thread(target=reader, daemon=True)
         self.reader_thread.start()
 
@@ -126,29 +139,84 @@ class VisionManager:
             callback({"error": "Worker not loaded"})
             return
 
-        request_id = self.next_request_id
-        self.next_request_id += 1
+        with self._send_lock:
+            request_id = self.next_request_id
+            self.next_request_id += 1
+
+            if direct_callback:
+                self.pending_callbacks[request_id] = (callback, True)
+            else:
+                self.pending_callbacks[request_id] = callback
+
+            cmd = {
+                "command": "full_analysis",
+                "image_path": image_path,
+                "request_id": request_id,
+                "need_objects": need_objects
+            }
+            try:
+                self.process.stdin.write(json.dumps(cmd) + "\n")
+                self.process.stdin.flush()
+            except Exception as e:
+                self.pending_callbacks.pop(request_id, None)
+                callback({"error": f"Send failed: {str(e)}"})
 
-        if direct_callback:
-            self.pending_callbacks[request_id] = (callback, True)
-        else:
-            self.pending_callbacks[request_id] = callback
-
-        cmd = {
-            "command": "full_analysis",
-            "image_path": image_path,
-            "request_id": request_id,
-            "need_objects": need_objects
-        }
-        try:
-            self.process.stdin.write(json.dumps(cmd) + "\n")
-            self.process.stdin.flush()
-        except Exception as e:
-            self.pending_callbacks.pop(request_id, None)
-            callback({"error": f"Send failed: {str(e)}"})
+    def send_analysis_batch(
+        self,
+        image_paths: List[str],
+        callbacks: List[Callable[[Dict[str, Any]], None]],
+        need_objects: bool = True,
+        direct_callback: bool = False
+    ):
+        """Send several images for analysis in one batched forward pass.
+
+        Each callback receives its own image's result, exactly like send_analysis.
+        """
+        if not self.is_loaded():
+            for callback in callbacks:
+                callback({"error": "Worker not loaded"})
+            return
+
+        with self._send_lock:
+            items = []
+            for image_path, callback in zip(image_paths, callbacks):
+                request_id = self.next_request_id
+                self.next_request_id += 1
+                self.pending_callbacks[request_id] = (callback, True) if direct_callback else callback
+                items.append({"image_path": image_path, "request_id": request_id})
+
+            cmd = {
+                "command": "batch_analysis",
+                "items": items,
+                "need_objects": need_objects
+            }
+            try:
+                self.process.stdin.write(json.dumps(cmd) + "\n")
+                self.process.stdin.flush()
+            except Exception as e:
+                for item, callback in zip(items, callbacks):
+                    self.pending_callbacks.pop(item["request_id"], None)
+                    callback({"error": f"Send failed: {str(e)}"})
+
+    def _fail_pending(self, message: str, generation: Optional[int] = None):
+        """Answer every outstanding request with an error instead of dropping it.
+
+        With `generation`, does nothing if the worker has been reloaded since.
+        """
+        with self._send_lock:
+            if generation is not None and generation != self.generation:
+                return
+            pending = list(self.pending_callbacks.values())
+            self.pending_callbacks.clear()
+        for callback_info in pending:
+            callback, direct = callback_info if isinstance(callback_info, tuple) else (callback_info, False)
+            if self.root and not direct:
+                self.root.after(0, lambda cb=callback: cb({"error": message}))
+            else:
+                callback({"error": message})
 
     def unload(self):
-        self.pending_callbacks.clear()
+        self._fail_pending("Worker unloaded")
 
         if self.process is not None:
             try:
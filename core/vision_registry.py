@@ -1,18 +1,35 @@
 # core/vision_registry.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
 from .vision_manager import VisionManager
 
 
 class VisionRegistry:
-    def __init__(self):
-        self.instances = []  # List of VisionManager
+    def __init__(self, cache_size: int = 512):
+        # Immutable snapshot of VisionManagers, replaced on add/unload so readers never lock
+        self.instances = ()
+        self._mutate_lock = threading.Lock()
+
+        # LRU of analysis results keyed by image content hash
+        self.cache_size = cache_size
+        self._analysis_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # (path, size, mtime_ns) -> content hash, so an unchanged file is read only once
+        self._key_memo = OrderedDict()
 
     def add(self, manager: VisionManager):
-        self.instances.append(manager)
+        with self._mutate_lock:
+            self.instances = self.instances + (manager,)
 
     def unload_all(self):
-        for manager in self.instances:
-            manager.unload()
-        self.instances.clear()
+        with self._mutate_lock:
+            for manager in self.instances:
+                manager.unload()
+            self.instances = ()
         try:
             import torch
             if torch.cuda.is_available():
@@ -26,3 +43,55 @@ class VisionRegistry:
     def get_loaded_count(self) -> int:
         """Return the number of currently loaded (active) instances."""
         return sum(1 for mgr in self.instances if mgr.is_loaded())
+
+    def get_loaded(self) -> list:
+        """Return the currently loaded instances."""
+        return [mgr for mgr in self.instances if mgr.is_loaded()]
+
+    def image_key(self, image_path: str) -> bytes:
+        """Content hash of an image file, used as the analysis cache key."""
+        st = os.stat(image_path)
+        stamp = (image_path, st.st_size, st.st_mtime_ns)
+        with self._cache_lock:
+            key = self._key_memo.get(stamp)
+            if key is not None:
+                self._key_memo.move_to_end(stamp)
+                return key
+
+        with open(image_path, "rb") as f:
+            key = hashlib.blake2b(f.read(), digest_size=16).digest()
+
+        with self._cache_lock:
+            self._key_memo[stamp] = key
+            while len(self._key_memo) > max(self.cache_size, 1):
+                self._key_memo.popitem(last=False)
+        return key
+
+    def get_cached_analysis(self, key: bytes, need_objects: bool = True):
+        """Return a cached analysis for this image, or None on a miss."""
+        if self.cache_size <= 0:
+            return None
+        with self._cache_lock:
+            entry = self._analysis_cache.get(key)
+            if entry is None:
+                return None
+            analysis, has_objects = entry
+            if need_objects and not has_objects:
+                return None
+            self._analysis_cache.move_to_end(key)
+        if not need_objects:
+            return {"caption": analysis.get("caption", ""), "objects": []}
+        return dict(analysis)
+
+    def cache_analysis(self, key: bytes, need_objects: bool, result: dict):
+        """Store a successful worker result ({"analysis": ...}) in the cache."""
+        if self.cache_size <= 0 or not result or "error" in result:
+            return
+        analysis = result.get("analysis")
+        if not analysis or "error" in analysis:
+            return
+        with self._cache_lock:
+            self._analysis_cache[key] = (dict(analysis), need_objects)
+            self._analysis_cache.move_to_end(key)
+            while len(self._analysis_cache) > self.cache_size:
+                self._analysis_cache.popitem(last=False)
@@ -16,7 +16,7 @@ from core import theme
 from core.image_manager import ImageManager, THUMBS_DIR, ORIGINALS_DIR
 from ui.ui_utils import (
     add_tooltip, add_text_context_menu, ImageContextMenu,
-    copy_image_to_clipboard, open_file_location
+    copy_image_to_clipboard, open_file_location, tag_canvas_children
 )
 
 # Settings config file
@@ -1343,6 +1343,7 @@ class ImagesTab:
         card.source_label = source_label
         card.tags_label = tags_label
 
+        tag_canvas_children(card, inside_canvas=True)
         self.card_pool.append(card)
 
     def _start_search(self):
@@ -1391,51 +1392,50 @@ class ImagesTab:
         self.add_images_btn.config(text="Stop Downloads", style="Small.Danger.TButton")
 
         async def download():
-            import aiohttp
             import asyncio
             sem = self.manager.get_semaphore(50)
-            async with aiohttp.ClientSession() as sess:
-                downloaded = 0
-
-                async def download_one(item):
-                    nonlocal downloaded
-                    if self._stop_download_requested:
-                        return None
-                    result = await self.manager.download_and_save(
-                        sess,
-                        item["url"],
-                        item["tags"],
-                        item["source"],
-                        item["query"],
-                        item.get("alt", ""),
-                        preview_only=preview_mode
-                    )
-                    if result:
-                        downloaded += 1
-                    self.right_panel.after(0, lambda d=downloaded, t=total: self.search_status.set(f"Processing {d}/{t} images..."))
-                    return result
-
-                async def limited_download(item):
-                    async with sem:
-                        return await download_one(item)
-
-                tasks = [limited_download(item) for item in results]
-                await asyncio.gather(*tasks, return_exceptions=True)
+            sess = await self.manager.get_session()
+            downloaded = 0
 
+            async def download_one(item):
+                nonlocal downloaded
                 if self._stop_download_requested:
-                    final_msg = f"Stopped - Downloaded {downloaded}/{total} images"
-                elif downloaded == total:
-                    final_msg = f"Download complete! {downloaded} images saved"
-                elif downloaded == 0:
-                    final_msg = "No images were saved (possible errors or duplicates)"
-                else:
-                    final_msg = f"Downloaded {downloaded}/{total} images"
+                    return None
+                result = await self.manager.download_and_save(
+                    sess,
+                    item["url"],
+                    item["tags"],
+                    item["source"],
+                    item["query"],
+                    item.get("alt", ""),
+                    preview_only=preview_mode
+                )
+                if result:
+                    downloaded += 1
+                self.right_panel.after(0, lambda d=downloaded, t=total: self.search_status.set(f"Processing {d}/{t} images..."))
+                return result
 
-                self._download_in_progress = False
-                self._stop_download_requested = False
-                self.right_panel.after(0, lambda msg=final_msg: self.search_status.set(msg))
-                self.right_panel.after(0, self._reset_download_button)
-                self.right_panel.after(0, self._load_all_images)
+            async def limited_download(item):
+                async with sem:
+                    return await download_one(item)
+
+            tasks = [limited_download(item) for item in results]
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            if self._stop_download_requested:
+                final_msg = f"Stopped - Downloaded {downloaded}/{total} images"
+            elif downloaded == total:
+                final_msg = f"Download complete! {downloaded} images saved"
+            elif downloaded == 0:
+                final_msg = "No images were saved (possible errors or duplicates)"
+            else:
+                final_msg = f"Downloaded {downloaded}/{total} images"
+
+            self._download_in_progress = False
+            self._stop_download_requested = False
+            self.right_panel.after(0, lambda msg=final_msg: self.search_status.set(msg))
+            self.right_panel.after(0, self._reset_download_button)
+            self.right_panel.after(0, self._load_all_images)
 
         def run():
             try:
@@ -1498,49 +1498,48 @@ class ImagesTab:
         self.search_status.set(f"Processing 0/{total} images...")
 
         async def process():
-            import aiohttp
             import asyncio
             sem = self.manager.get_semaphore(50)
-            async with aiohttp.ClientSession() as sess:
-                downloaded = 0
-                skipped = 0
-
-                async def download_one(url):
-                    nonlocal downloaded, skipped
-                    # Check if stop was requested
-                    if self._stop_download_requested:
-                        skipped += 1
-                        return None
-                    result = await self.manager.download_and_save(
-                        sess, url, tags, source, query, alt, preview_only=preview_only
-                    )
-                    if result:
-                        downloaded += 1
-                    self.right_panel.after(0, lambda d=downloaded, t=total: self.search_status.set(f"Processing {d}/{t} images..."))
-                    return result
-
-                async def limited_download(url):
-                    async with sem:
-                        return await download_one(url)
-
-                concurrent_tasks = [limited_download(url) for url in urls]
-                await asyncio.gather(*concurrent_tasks, return_exceptions=True)
-
-                # Build final message
+            sess = await self.manager.get_session()
+            downloaded = 0
+            skipped = 0
+
+            async def download_one(url):
+                nonlocal downloaded, skipped
+                # Check if stop was requested
                 if self._stop_download_requested:
-                    final_msg = f"Stopped - Downloaded {downloaded}/{total} images"
-                elif downloaded == total:
-                    final_msg = f"Download complete! {downloaded} images saved"
-                elif downloaded == 0:
-                    final_msg = "No images were saved (possible errors or duplicates)"
-                else:
-                    final_msg = f"Downloaded {downloaded}/{total} images"
+                    skipped += 1
+                    return None
+                result = await self.manager.download_and_save(
+                    sess, url, tags, source, query, alt, preview_only=preview_only
+                )
+                if result:
+                    downloaded += 1
+                self.right_panel.after(0, lambda d=downloaded, t=total: self.search_status.set(f"Processing {d}/{t} images..."))
+                return result
 
-                self._download_in_progress = False
-                self._stop_download_requested = False
-                self.right_panel.after(0, lambda msg=final_msg: self.search_status.set(msg))
-                self.right_panel.after(0, self._reset_download_button)
-                self.right_panel.after(0, self._load_all_images)
+            async def limited_download(url):
+                async with sem:
+                    return await download_one(url)
+
+            concurrent_tasks = [limited_download(url) for url in urls]
+            await asyncio.gather(*concurrent_tasks, return_exceptions=True)
+
+            # Build final message
+            if self._stop_download_requested:
+                final_msg = f"Stopped - Downloaded {downloaded}/{total} images"
+            elif downloaded == total:
+                final_msg = f"Download complete! {downloaded} images saved"
+            elif downloaded == 0:
+                final_msg = "No images were saved (possible errors or duplicates)"
+            else:
+                final_msg = f"Downloaded {downloaded}/{total} images"
+
+            self._download_in_progress = False
+            self._stop_download_requested = False
+            self.right_panel.after(0, lambda msg=final_msg: self.search_status.set(msg))
+            self.right_panel.after(0, self._reset_download_button)
+            self.right_panel.after(0, self._load_all_images)
 
         def run():
             try:
@@ -1623,20 +1622,9 @@ class ImagesTab:
                         "preview_only": 0 if copy_full else 1
                     }
 
-                    # Insert into database (thread-safe with check_same_thread=False)
+                    # Committed with the manager's batched inserts
                     try:
-                        with self.manager.conn:
-                            self.manager.conn.execute("""
-                                INSERT OR IGNORE INTO images
-                                (id, filename, path, thumb_path, url, source, query, width, height, alt, tags, preview_only)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """, (
-                                metadata['id'], metadata['filename'], metadata['path'],
-                                metadata['thumb_path'], metadata['url'], metadata['source'],
-                                metadata['query'], metadata['width'], metadata['height'],
-                                metadata['alt'], metadata['tags'], metadata['preview_only']
-                            ))
-                        self.manager.existing_urls.add(metadata['url'])
+                        await self.manager.insert_image(metadata)
                     except Exception:
                         pass
 
@@ -2059,28 +2047,18 @@ class ImagesTab:
                     caption = result["analysis"].get("caption", "")
                     objects = result["analysis"].get("objects", [])
 
-                    update_fields = []
-                    update_values = []
+                    fields = {"vision_processed": 1}
 
                     if self.apply_captions_var.get():
-                        update_fields.append("alt = ?")
-                        update_values.append(caption)
+                        fields["alt"] = caption
 
                     if self.apply_tags_var.get():
-                        cur = self.manager.conn.execute("SELECT tags FROM images WHERE id = ?", (img_id,))
-                        row = cur.fetchone()
-                        existing = [t.lower() for t in json.loads(row[0])] if row and row[0] else []
+                        stored = self.manager.get_tags_by_ids([img_id]).get(img_id)
+                        existing = [t.lower() for t in json.loads(stored)] if stored else []
                         merged = objects + [t for t in existing if t not in objects]
-                        update_fields.append("tags = ?")
-                        update_values.append(json.dumps(merged))
-
-                    update_fields.append("vision_processed = 1")
+                        fields["tags"] = json.dumps(merged)
 
-                    if update_fields:
-                        sql = f"UPDATE images SET {', '.join(update_fields)} WHERE id = ?"
-                        update_values.append(img_id)
-                        with self.manager.conn:
-                            self.manager.conn.execute(sql, update_values)
+                    self.manager.update_image_fields(img_id, fields)
 
                 processed += 1
                 self.right_panel.after(0, lambda p=processed: self.vision_status_var.set(f"Analyzing {p}/{total} images..."))
@@ -331,3 +331,20 @@ def _clear_entry(widget):
     else:
         widget.delete(0, tk.END)
     widget.focus_set()
+
+
+# Bindtag for widgets inside a scrollable canvas (focus-scroll blocker)
+CANVAS_CHILD_TAG = "CanvasChild"
+
+
+def tag_canvas_children(widget, inside_canvas=False):
+    """Add the CanvasChild bindtag to every canvas and widget nested inside one."""
+    inside_canvas = inside_canvas or isinstance(widget, tk.Canvas)
+    if inside_canvas:
+        tags = widget.bindtags()
+        if CANVAS_CHILD_TAG not in tags:
+            # Slot in before "all" so a "break" still stops the global bindings
+            widget.bindtags(tags[:-1] + (CANVAS_CHILD_TAG,) + tags[-1:])
+
+    for child in widget.winfo_children():
+        tag_canvas_children(child, inside_canvas)
@@ -21,6 +21,8 @@ from transformers import AutoProcessor, AutoModelForCausalLM
 from huggingface_hub import snapshot_download
 from PIL import Image
 import gc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from core import logger
 
 os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
@@ -30,6 +32,7 @@ is_cpu_mode = False
 
 SCRIPT_DIR = Path(__file__).parent
 MODELS_DIR = SCRIPT_DIR / "models"
+SETTINGS_FILE = SCRIPT_DIR / "config" / "settings.json"
 FLORENCE_MODEL_DIR = MODELS_DIR / "florence2-large"
 REPO_ID = "microsoft/Florence-2-large"
 
@@ -37,8 +40,40 @@ model = None
 processor = None
 device = None
 
+# Florence-2 resizes every image to this; JPEGs never need decoding at full resolution
+MODEL_INPUT_SIZE = (768, 768)
 
-def load_model(target_device: str):
+# Images in a batch are decoded in parallel (PIL releases the GIL while decoding)
+_decode_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4), thread_name_prefix="ImgDecode")
+
+
+def _load_precision_setting() -> str:
+    """Read vision_precision ('auto', 'fp32', 'fp16', 'bf16') from settings."""
+    try:
+        with open(SETTINGS_FILE, "r") as f:
+            return json.load(f).get("vision_precision", "auto")
+    except Exception:
+        return "auto"
+
+
+def _resolve_dtype(target_device: str, precision: str):
+    """Pick the model dtype for a device and precision setting."""
+    if not target_device.startswith("cuda") or precision == "fp32":
+        return torch.float32
+    if precision == "fp16":
+        return torch.float16
+    # "bf16" / "auto": BF16 where the GPU supports it, else FP16
+    return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
+
+def _inference_context():
+    """Autocast to the model's reduced precision on CUDA (no-op on CPU / FP32)."""
+    if device is not None and device.type == "cuda" and model.dtype != torch.float32:
+        return torch.autocast(device_type="cuda", dtype=model.dtype)
+    return nullcontext()
+
+
+def load_model(target_device: str, precision: str = "auto"):
     global model, processor, device, is_cpu_mode
 
     if model is not None:
@@ -70,10 +105,10 @@ def load_model(target_device: str):
         torch.set_num_interop_threads(max(1, CPU_THREADS // 2))
         logger.info(f"[Florence-2 Worker] CPU mode: using {CPU_THREADS} threads")
 
-    torch_dtype = torch.float16 if target_device.startswith("cuda") else torch.float32
+    torch_dtype = _resolve_dtype(target_device, precision)
     device = torch.device(target_device)
 
-    logger.info(f"[Florence-2 Worker] Loading model onto {device} ...")
+    logger.info(f"[Florence-2 Worker] Loading model onto {device} ({torch_dtype}) ...")
     processor = AutoProcessor.from_pretrained(str(FLORENCE_MODEL_DIR), trust_remote_code=True)
     model = AutoModelForCausalLM.from_pretrained(
         str(FLORENCE_MODEL_DIR),
@@ -97,7 +132,7 @@ def generate_caption(image_path: str, detailed: bool = True) -> str:
         task_prompt = "<MORE_DETAILED_CAPTION>" if detailed else "<CAPTION>"
         inputs = processor(text=task_prompt, images=image, return_tensors="pt").to(device, model.dtype)
 
-        with torch.no_grad():
+        with torch.inference_mode(), _inference_context():
             generated_ids = model.generate(
                 **inputs,
                 max_new_tokens=200,
@@ -115,74 +150,109 @@ def generate_caption(image_path: str, detailed: bool = True) -> str:
         return f"[ERROR] {str(e)}"
 
 
-def full_analysis(image_path: str, request_id: int = None, need_objects: bool = True) -> dict:
-    global model, processor, device, is_cpu_mode
+# Repetitive caption prefixes stripped from detailed captions
+CAPTION_PREFIXES = [
+    "The image shows ",
+    "The image is ",
+    "The image depicts ",
+    "The photo shows ",
+    "The picture shows ",
+    "This image shows ",
+    "The image features "
+]
 
-    if model is None:
-        return {"error": "Model not loaded"}
 
-    try:
-        image = Image.open(image_path).convert("RGB")
-        image_size = (image.width, image.height)
+def _clean_caption(caption: str) -> str:
+    """Remove common repetitive prefixes and clean up capitalization."""
+    cleaned = caption.strip()
+    for prefix in CAPTION_PREFIXES:
+        if cleaned.lower().startswith(prefix.lower()):
+            cleaned = cleaned[len(prefix):].strip()
+            break
 
-        def run_task(task_prompt: str, max_new_tokens: int = 1024):
-            inputs = processor(text=task_prompt, images=image, return_tensors="pt").to(device, model.dtype)
+    if cleaned:
+        cleaned = cleaned[0].upper() + cleaned[1:]
 
-            with torch.no_grad():
-                generated_ids = model.generate(
-                    **inputs,
-                    max_new_tokens=max_new_tokens,
-                    do_sample=False,
-                    num_beams=3,
-                )
+    return cleaned
 
-            generated_text = processor.batch_decode(generated_ids, skip_special_tokens=False)[0]
-            parsed = processor.post_process_generation(generated_text, task=task_prompt, image_size=image_size)
-            return parsed.get(task_prompt, {} if '<OD>' in task_prompt else "")
 
-        results = {"caption": "", "objects": []}
+def _load_image(image_path: str) -> Image.Image:
+    """Decode an image as RGB; JPEGs decode at a reduced scale no smaller than the model input."""
+    img = Image.open(image_path)
+    img.draft("RGB", MODEL_INPUT_SIZE)
+    return img.convert("RGB")
 
-        # Always run detailed caption
-        caption = run_task('<MORE_DETAILED_CAPTION>', max_new_tokens=300)
-
-        # Remove common repetitive prefixes and clean up capitalization
-        prefixes = [
-            "The image shows ",
-            "The image is ",
-            "The image depicts ",
-            "The photo shows ",
-            "The picture shows ",
-            "This image shows ",
-            "The image features "
-        ]
-
-        cleaned = caption.strip()
-        for prefix in prefixes:
-            if cleaned.lower().startswith(prefix.lower()):
-                cleaned = cleaned[len(prefix):].strip()
-                break
 
-        if cleaned:
-            cleaned = cleaned[0].upper() + cleaned[1:]
+def _run_task_batch(images: list, task_prompt: str, max_new_tokens: int = 1024) -> list:
+    """Run one Florence-2 task over a batch of images in a single forward pass."""
+    inputs = processor(text=[task_prompt] * len(images), images=images, return_tensors="pt").to(device, model.dtype)
 
-        results["caption"] = cleaned
+    with torch.inference_mode(), _inference_context():
+        generated_ids = model.generate(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            do_sample=False,
+            num_beams=3,
+        )
+
+    generated_texts = processor.batch_decode(generated_ids, skip_special_tokens=False)
+    empty = {} if '<OD>' in task_prompt else ""
+    return [
+        processor.post_process_generation(text, task=task_prompt, image_size=(img.width, img.height)).get(task_prompt, empty)
+        for text, img in zip(generated_texts, images)
+    ]
 
-        # Only run object detection if requested
-        if need_objects:
-            od = run_task('<OD>', max_new_tokens=300)
-            objects = od.get('labels', [])
-            unique_objects = list(set(obj.strip().lower() for obj in objects if obj.strip() and len(obj.strip()) > 2))
-            unique_objects.sort()
-            results["objects"] = unique_objects
-
-        # CPU throttle: small delay to prevent system overload
-        if is_cpu_mode:
-            time.sleep(0.1)  # 100ms breathing room
 
+def batch_analysis(image_paths: list, need_objects: bool = True) -> list:
+    """Caption (and optionally detect objects in) a batch of images. Returns one dict per path."""
+    global model, processor, device, is_cpu_mode
+
+    if model is None:
+        return [{"error": "Model not loaded"} for _ in image_paths]
+
+    results = [None] * len(image_paths)
+    images = []
+    positions = []
+    decoding = [_decode_pool.submit(_load_image, image_path) for image_path in image_paths]
+    for i, future in enumerate(decoding):
+        try:
+            images.append(future.result())
+            positions.append(i)
+        except Exception as e:
+            results[i] = {"error": str(e)}
+
+    if not images:
         return results
 
+    try:
+        # Always run detailed caption
+        captions = _run_task_batch(images, '<MORE_DETAILED_CAPTION>', max_new_tokens=300)
+
+        # Only run object detection if requested
+        detections = _run_task_batch(images, '<OD>', max_new_tokens=300) if need_objects else None
+
+        for n, i in enumerate(positions):
+            result = {"caption": _clean_caption(captions[n]), "objects": []}
+            if detections is not None:
+                objects = detections[n].get('labels', [])
+                unique_objects = list(set(obj.strip().lower() for obj in objects if obj.strip() and len(obj.strip()) > 2))
+                unique_objects.sort()
+                result["objects"] = unique_objects
+            results[i] = result
+
+        # CPU throttle: small delay per image to prevent system overload
+        if is_cpu_mode:
+            time.sleep(0.1 * len(images))
+
     except Exception as e:
-        return {"error": str(e)}
+        for i in positions:
+            results[i] = {"error": str(e)}
+
+    return results
+
+
+def full_analysis(image_path: str, request_id: int = None, need_objects: bool = True) -> dict:
+    return batch_analysis([image_path], need_objects)[0]
 
 
 def unload():
@@ -214,7 +284,8 @@ def main():
 
             if command == "load":
                 target_device = data.get("device", "cpu")
-                load_model(target_device)
+                precision = data.get("precision") or _load_precision_setting()
+                load_model(target_device, precision)
                 print(json.dumps({"status": "loaded"}), flush=True)
 
             elif command == "caption":
@@ -236,6 +307,17 @@ def main():
                 result = full_analysis(image_path, req_id, need_objects)
                 print(json.dumps({"analysis": result, "request_id": req_id}), flush=True)
 
+            elif command == "batch_analysis":
+                items = data.get("items", [])
+                if model is None:
+                    for item in items:
+                        print(json.dumps({"error": "Model not loaded", "request_id": item.get("request_id")}), flush=True)
+                    continue
+                need_objects = data.get("need_objects", True)
+                results = batch_analysis([item["image_path"] for item in items], need_objects)
+                for item, result in zip(items, results):
+                    print(json.dumps({"analysis": result, "request_id": item.get("request_id")}), flush=True)
+
             elif command == "exit":
                 unload()
                 break